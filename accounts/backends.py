@@ -0,0 +1,87 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.backends import ModelBackend
+from django.contrib.auth.hashers import check_password, make_password
+from django.core.cache import caches
+
+UserModel = get_user_model()
+
+# Every login's password hash runs here, so a burst of logins queues for these
+# threads instead of taking every core
+PASSWORD_HASH_POOL = ThreadPoolExecutor(
+    max_workers=getattr(settings, 'LOGIN_HASH_THREADS', 4), thread_name_prefix='password-hash',
+)
+
+def _user_cache_key(user_id):
+    return f'accounts:user:{user_id}'
+
+def forget_cached_user(user_id):
+    caches[settings.SESSION_CACHE_ALIAS].delete(_user_cache_key(user_id))
+
+class EmailBackend(ModelBackend):
+    """
+    Log in with emailid and password. The user is found in one query on the
+    lower(emailid) index, so mixed-case input matches; unknown emails still pay
+    for one password hash so response times don't reveal which emails exist.
+    """
+
+    def authenticate(self, request, email=None, password=None, **kwargs):
+        if not email or password is None:
+            return None
+        try:
+            user = UserModel.objects.with_emailid(email).get()
+        except UserModel.DoesNotExist:
+            # Run the default password hasher once to reduce the timing difference
+            PASSWORD_HASH_POOL.submit(make_password, password).result()
+            return None
+
+        outdated = []
+        valid = PASSWORD_HASH_POOL.submit(check_password, password, user.password, outdated.append).result()
+        if not (valid and self.user_can_authenticate(user)):
+            return None
+        if outdated:
+            user.set_password(password)
+            user.save(update_fields=['password'])
+        return user
+
+    async def aauthenticate(self, request, email=None, password=None, **kwargs):
+        """
+        authenticate() without a sync thread, for django.contrib.auth.aauthenticate
+        on Django versions that call backends' aauthenticate directly
+        """
+        if not email or password is None:
+            return None
+        loop = asyncio.get_running_loop()
+        try:
+            user = await UserModel.objects.with_emailid(email).aget()
+        except UserModel.DoesNotExist:
+            await loop.run_in_executor(PASSWORD_HASH_POOL, make_password, password)
+            return None
+
+        # The hasher only reports an outdated hash; the rehash is saved off the pool
+        outdated = []
+        valid = await loop.run_in_executor(
+            PASSWORD_HASH_POOL, check_password, password, user.password, outdated.append,
+        )
+        if not (valid and self.user_can_authenticate(user)):
+            return None
+        if outdated:
+            user.set_password(password)
+            await sync_to_async(user.save)(update_fields=['password'])
+        return user
+
+    def get_user(self, user_id):
+        """The session's user, from the sessions cache when it's there (see signals.py for invalidation)"""
+        cache = caches[settings.SESSION_CACHE_ALIAS]
+        key = _user_cache_key(user_id)
+        user = cache.get(key)
+        if user is None:
+            user = super().get_user(user_id)
+            if user is not None:
+                cache.set(key, user, getattr(settings, 'USER_CACHE_TIMEOUT', 300))
+            return user
+        return user if self.user_can_authenticate(user) else None
@@ -0,0 +1,78 @@
+import csv
+import re
+import statistics
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from http.cookiejar import CookieJar
+from urllib.error import HTTPError
+from urllib.parse import urlencode
+from urllib.request import HTTPCookieProcessor, HTTPRedirectHandler, build_opener
+
+from django.core.management.base import BaseCommand, CommandError
+
+CSRF_INPUT = re.compile(r'name="csrfmiddlewaretoken" value="([^"]+)"')
+
+
+class _NoRedirect(HTTPRedirectHandler):
+    def redirect_request(self, *args, **kwargs):
+        return None
+
+
+class Command(BaseCommand):
+    help = (
+        'Fire a burst of logins at a running server and report latency percentiles. '
+        'Credentials come from a CSV with email and password columns; every login is '
+        'a fresh client that fetches the login page for its CSRF token, then posts. '
+        'Only the POST is timed.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('credentials', help='CSV file with email and password columns')
+        parser.add_argument('--url', default='http://127.0.0.1:8000/login/', help='Login page URL')
+        parser.add_argument('--requests', type=int, default=200, help='Logins to send, cycling through the credentials')
+        parser.add_argument('--concurrency', type=int, default=50, help='Logins in flight at once')
+
+    def handle(self, *args, **options):
+        try:
+            with open(options['credentials'], newline='', encoding='utf-8-sig') as f:
+                credentials = [(row['email'], row['password']) for row in csv.DictReader(f)]
+        except (OSError, KeyError) as e:
+            raise CommandError(f'Cannot read email/password pairs from {options["credentials"]}: {e}')
+        if not credentials or options['requests'] < 1 or options['concurrency'] < 1:
+            raise CommandError('Need at least one credential, request and concurrent client.')
+
+        logins = [credentials[i % len(credentials)] for i in range(options['requests'])]
+        started = time.monotonic()
+        with ThreadPoolExecutor(max_workers=options['concurrency']) as executor:
+            results = list(executor.map(lambda login: self.login(options['url'], *login), logins))
+        elapsed = time.monotonic() - started
+
+        latencies = sorted(latency for _, latency in results)
+        statuses = Counter(status for status, _ in results)
+
+        def percentile(fraction):
+            return latencies[min(len(latencies) - 1, int(fraction * len(latencies)))] * 1000
+
+        self.stdout.write(f'{len(results)} logins, {options["concurrency"]} concurrent, in {elapsed:.1f}s '
+                          f'({len(results) / elapsed:.1f}/s)')
+        self.stdout.write('Statuses: ' + ', '.join(f'{status}×{count}' for status, count in sorted(statuses.items())))
+        self.stdout.write(self.style.SUCCESS(
+            f'Latency ms: p50 {percentile(0.5):.0f}, p90 {percentile(0.9):.0f}, '
+            f'p99 {percentile(0.99):.0f}, max {latencies[-1] * 1000:.0f}, '
+            f'mean {statistics.mean(latencies) * 1000:.0f}'
+        ))
+
+    def login(self, url, email, password):
+        """(status, seconds) of one login: 302 means logged in, 200 rejected, 429 rate limited"""
+        opener = build_opener(HTTPCookieProcessor(CookieJar()), _NoRedirect)
+        with opener.open(url) as response:
+            token = CSRF_INPUT.search(response.read().decode()).group(1)
+        body = urlencode({'csrfmiddlewaretoken': token, 'email': email, 'password': password}).encode()
+        started = time.monotonic()
+        try:
+            with opener.open(url, body) as response:
+                status = response.status
+        except HTTPError as e:
+            status = e.code
+        return status, time.monotonic() - started
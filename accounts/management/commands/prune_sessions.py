@@ -0,0 +1,43 @@
+import time
+from importlib import import_module
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+
+class Command(BaseCommand):
+    help = (
+        'Delete expired sessions from the database in batches, so the table never takes one '
+        'long DELETE. Cached copies expire on their own; signed-cookie sessions keep nothing '
+        'server-side. Runs once, or every --loop seconds.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=5000, help='Sessions deleted per statement')
+        parser.add_argument('--loop', type=int, metavar='SECONDS', help='Keep running, pruning this often')
+
+    def handle(self, *args, **options):
+        if options['batch_size'] < 1:
+            raise CommandError('--batch-size must be positive.')
+        store = import_module(settings.SESSION_ENGINE).SessionStore
+        if not hasattr(store, 'get_model_class'):
+            self.stdout.write(f'{settings.SESSION_ENGINE} keeps no session table; nothing to prune.')
+            return
+        sessions = store.get_model_class().objects
+
+        while True:
+            now = timezone.now()
+            deleted = 0
+            while True:
+                keys = list(
+                    sessions.filter(expire_date__lt=now).values_list('session_key', flat=True)[:options['batch_size']]
+                )
+                if not keys:
+                    break
+                deleted += sessions.filter(session_key__in=keys).delete()[0]
+
+            self.stdout.write(self.style.SUCCESS(f'Deleted {deleted} expired sessions.'))
+            if not options['loop']:
+                return
+            time.sleep(options['loop'])
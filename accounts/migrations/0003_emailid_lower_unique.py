@@ -0,0 +1,26 @@
+# Generated by Django 5.1 on 2026-10-18 11:41
+
+import accounts.models
+import django.db.models.functions.text
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0002_customuser_emailid'),
+        ('auth', '0012_alter_user_first_name_max_length'),
+    ]
+
+    operations = [
+        migrations.AlterModelManagers(
+            name='customuser',
+            managers=[
+                ('objects', accounts.models.CustomUserManager()),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='customuser',
+            constraint=models.UniqueConstraint(django.db.models.functions.text.Lower('emailid'), name='accounts_user_emailid_lower_uniq', violation_error_message='A user with this email ID already exists.'),
+        ),
+    ]
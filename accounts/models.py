@@ -1,5 +1,11 @@
 from django.db import models
-from django.contrib.auth.models import AbstractUser
+from django.db.models.functions import Lower
+from django.contrib.auth.models import AbstractUser, UserManager
+
+class CustomUserManager(UserManager):
+    def with_emailid(self, emailid):
+        """Case-insensitive emailid match, served by the lower(emailid) unique index"""
+        return self.alias(emailid_lower=Lower('emailid')).filter(emailid_lower=emailid.strip().lower())
 
 class CustomUser(AbstractUser):
     ROLE_CHOICES = [
@@ -12,5 +18,15 @@ class CustomUser(AbstractUser):
     phone = models.CharField(max_length=20, blank=True)
     emailid = models.EmailField(blank=True, null=True, unique=True, help_text="Primary email address for the user")
 
+    objects = CustomUserManager()
+
+    class Meta(AbstractUser.Meta):
+        constraints = [
+            models.UniqueConstraint(
+                Lower('emailid'), name='accounts_user_emailid_lower_uniq',
+                violation_error_message='A user with this email ID already exists.',
+            ),
+        ]
+
     def __str__(self):
         return f"{self.username} ({self.get_role_display()})"
@@ -0,0 +1,99 @@
+"""
+Sliding-window limits on failed logins, checked before any password is hashed.
+
+Failed attempts are counted per client IP and per normalised emailid in fixed
+windows of settings.LOGIN_RATE_LIMIT['window'] seconds. The current count plus
+the previous window's count, weighted by how much of it still overlaps the
+sliding window, estimates the failures in the last `window` seconds without
+storing a timestamp per attempt. Successful logins are never counted, so a
+shift change behind one NAT address isn't throttled, and they clear the
+account's count. Counters live in the LOGIN_RATE_LIMIT['cache'] alias.
+"""
+import math
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+
+DEFAULT_LIMITS = {
+    'ip': 100,  # Failures per window from one address; an office behind NAT shares one
+    'emailid': 10,  # Failures per window against one account, from anywhere
+    'window': 300,  # Seconds
+    'cache': 'default',
+}
+
+
+def login_limits():
+    return {**DEFAULT_LIMITS, **getattr(settings, 'LOGIN_RATE_LIMIT', {})}
+
+
+def client_ip(request):
+    # REMOTE_ADDR only; a proxy in front must set it to the real client address
+    return request.META.get('REMOTE_ADDR', '')
+
+
+def _keys(request, emailid):
+    keys = {'ip': f'login_attempts:ip:{client_ip(request)}'}
+    if emailid:
+        keys['emailid'] = f'login_attempts:emailid:{emailid.strip().lower()}'
+    return keys
+
+
+def _windows(limits):
+    window = limits['window']
+    now = time.time()
+    current = int(now // window)
+    # Share of the previous window still inside the sliding window
+    overlap = 1 - (now % window) / window
+    return current, overlap
+
+
+def login_retry_after(request, emailid):
+    """
+    Seconds to wait if the client or the account has failed too often recently,
+    or 0 if the attempt may go ahead. Doesn't count the attempt itself.
+    """
+    limits = login_limits()
+    cache = caches[limits['cache']]
+    window = limits['window']
+    current, overlap = _windows(limits)
+
+    keys = _keys(request, emailid)
+    counts = cache.get_many([f'{key}:{index}' for key in keys.values() for index in (current - 1, current)])
+    retry_after = 0
+    for name, key in keys.items():
+        earlier = counts.get(f'{key}:{current - 1}', 0)
+        count = counts.get(f'{key}:{current}', 0)
+        # The attempt being made would be failure count + 1
+        if earlier * overlap + count + 1 > limits[name]:
+            if count + 1 > limits[name]:
+                # Over on this window alone: wait for it to end
+                wait = window * overlap
+            else:
+                # Until the previous window's weight has decayed below the headroom
+                wait = window * (overlap - (limits[name] - count - 1) / earlier)
+            retry_after = max(retry_after, math.ceil(wait))
+    return max(retry_after, 1) if retry_after else 0
+
+
+def record_failed_login(request, emailid):
+    limits = login_limits()
+    cache = caches[limits['cache']]
+    current, _ = _windows(limits)
+    for key in _keys(request, emailid).values():
+        bucket = f'{key}:{current}'
+        # Two windows' lifetime so the previous count is still there to weight
+        cache.add(bucket, 0, timeout=2 * limits['window'])
+        try:
+            cache.incr(bucket)
+        except ValueError:
+            cache.set(bucket, 1, timeout=2 * limits['window'])
+
+
+def clear_login_attempts(emailid):
+    """Forget an account's failed attempts after it logs in"""
+    limits = login_limits()
+    cache = caches[limits['cache']]
+    key = f'login_attempts:emailid:{emailid.strip().lower()}'
+    current, _ = _windows(limits)
+    cache.delete_many([f'{key}:{current}', f'{key}:{current - 1}'])
@@ -0,0 +1,12 @@
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from .backends import forget_cached_user
+
+@receiver(post_save, sender=get_user_model())
+@receiver(post_delete, sender=get_user_model())
+def invalidate_cached_user(sender, instance, **kwargs):
+    """Every save, password changes and last_login included, drops the copy the session loads"""
+    user_id = instance.pk
+    transaction.on_commit(lambda: forget_cached_user(user_id))
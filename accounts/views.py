@@ -1,32 +1,41 @@
+from asgiref.sync import sync_to_async
 from django.shortcuts import render, redirect
-from django.contrib.auth import authenticate, login, logout
+from django.contrib.auth import aauthenticate, alogin, logout
 from django.contrib import messages
 from django.contrib.auth.decorators import login_required
 from django.contrib.auth.password_validation import validate_password
 from django.core.exceptions import ValidationError
 from django.utils import timezone
 from accounts.models import CustomUser
+from accounts.ratelimit import clear_login_attempts, login_retry_after, record_failed_login
 from employee.models import Employee, Department
 
-def login_view(request):
+async def login_view(request):
+    """Async so that, served by asgi.py, waiting on the password hash holds no worker"""
     if request.method == 'POST':
         email = request.POST.get('email')
         password = request.POST.get('password')
 
-        # Find user by email
-        try:
-            user = CustomUser.objects.get(emailid=email)
-            # Authenticate using the found user's username
-            user = authenticate(request, username=user.username, password=password)
+        # Rejected before any hashing, so a flood of bad attempts stays cheap
+        retry_after = await sync_to_async(login_retry_after)(request, email)
+        if retry_after:
+            messages.error(request, f'Too many login attempts. Please try again in {retry_after} seconds.')
+            response = await sync_to_async(render)(request, 'auth/login.html', status=429)
+            response['Retry-After'] = str(retry_after)
+            return response
+
+        # Goes through AUTHENTICATION_BACKENDS (EmailBackend hashes in its bounded pool)
+        # and sends user_login_failed on a miss
+        user = await aauthenticate(request, email=email, password=password)
         if user is not None:
-            login(request, user)
+            if email:
+                await sync_to_async(clear_login_attempts)(email)
+            await alogin(request, user)
             return redirect('dashboard')
-        else:
-                messages.error(request, 'Invalid email or password.')
-        except CustomUser.DoesNotExist:
-            messages.error(request, 'Invalid email or password.')
+        await sync_to_async(record_failed_login)(request, email)
+        messages.error(request, 'Invalid email or password.')
 
-    return render(request, 'auth/login.html')
+    return await sync_to_async(render)(request, 'auth/login.html')
 
 def signup_view(request):
     if request.method == 'POST':
@@ -53,7 +62,7 @@ def signup_view(request):
             messages.error(request, 'Employee ID already exists.')
             return render(request, 'auth/signup.html')
 
-        if emailid and CustomUser.objects.filter(emailid=emailid).exists():
+        if emailid and CustomUser.objects.with_emailid(emailid).exists():
             messages.error(request, 'Email ID already exists.')
             return render(request, 'auth/signup.html')
 
@@ -93,19 +102,24 @@ def logout_view(request):
 @login_required
 def dashboard(request):
     from employee.models import Employee, Department
-    from hr.models import LeaveRequest, Attendance
+    from hr.models import LeaveRequest, Attendance, AttendanceSummary, LeaveBalance
+    from django.db.models import Sum
+    from django.db.models.functions import Coalesce
 
     context = {'user': request.user}
 
     # Get current user's employee profile for employee dashboard
-    try:
-        current_employee = Employee.objects.get(user=request.user)
-        context['current_employee'] = current_employee
-
-        # Get employee's attendance stats
+    current_employee = request.employee
+    context['current_employee'] = current_employee
+    if current_employee:
+        # Get employee's attendance stats from the monthly rollup
         employee_attendance = Attendance.objects.filter(employee=current_employee)
-        total_days = employee_attendance.count()
-        present_days = employee_attendance.filter(status='present').count()
+        totals = AttendanceSummary.objects.filter(employee=current_employee).aggregate(
+            total_days=Coalesce(Sum('total_count'), 0),
+            present_days=Coalesce(Sum('present_count'), 0),
+        )
+        total_days = totals['total_days']
+        present_days = totals['present_days']
         attendance_rate = round((present_days / total_days * 100), 1) if total_days > 0 else 0
 
         context.update({
@@ -119,8 +133,8 @@ def dashboard(request):
         employee_leaves = LeaveRequest.objects.filter(employee=current_employee).order_by('-created_at')[:3]
         context['recent_leaves'] = employee_leaves
 
-    except Employee.DoesNotExist:
-        context['current_employee'] = None
+        # Leave balances are kept up to date by the ledger, so this is one indexed read
+        context['leave_balances'] = LeaveBalance.objects.filter(employee=current_employee)
 
     # Add HR-specific data if user is HR or admin
     if request.user.role == 'hr' or request.user.is_staff:
@@ -138,9 +152,8 @@ def dashboard(request):
 @login_required
 def employee_profile(request):
     """View and edit employee profile"""
-    try:
-        employee = Employee.objects.get(user=request.user)
-    except Employee.DoesNotExist:
+    employee = request.employee
+    if not employee:
         messages.error(request, 'Employee profile not found.')
         return redirect('dashboard')
 
@@ -157,7 +170,7 @@ def employee_profile(request):
         request.user.emailid = request.POST.get('emailid', request.user.emailid)
 
         try:
-            employee.save()
+            employee.save(update_fields=['position', 'department', 'phone', 'address'])
             request.user.save()
             messages.success(request, 'Profile updated successfully!')
         except Exception as e:
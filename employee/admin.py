@@ -1,5 +1,6 @@
 from django.contrib import admin
 from .models import Department, Employee
+from .search import filter_employees
 
 @admin.register(Department)
 class DepartmentAdmin(admin.ModelAdmin):
@@ -11,3 +12,10 @@ class EmployeeAdmin(admin.ModelAdmin):
     list_display = ('user', 'employee_id', 'department', 'position', 'hire_date')
     list_filter = ('department', 'hire_date')
     search_fields = ('user__username', 'employee_id', 'user__first_name', 'user__last_name')
+    raw_id_fields = ('reports_to',)
+
+    def get_search_results(self, request, queryset, search_term):
+        # Served by the directory search index instead of icontains across joins
+        if not search_term:
+            return queryset, False
+        return filter_employees(queryset, search_term), False
@@ -0,0 +1,150 @@
+"""
+Per-department headcount, compensation and hiring figures.
+
+Everything is aggregated in the database: headcount and salary totals,
+averages and extremes with one GROUP BY, hires per quarter with another. Salary
+percentiles use percentile_cont on PostgreSQL; other databases have no
+ordered-set aggregates, so there (department, salary) pairs are read with
+values_list and the percentiles are taken with NumPy. The finished report is
+cached under a version that is bumped whenever an employee is added or
+removed or their salary, department or hire date changes (see signals.py).
+"""
+from collections import defaultdict
+from datetime import date
+
+import numpy as np
+from django.core.cache import cache
+from django.db import connection
+from django.db.models import Aggregate, Avg, Count, FloatField, Max, Min, Sum
+from django.db.models.functions import ExtractQuarter, ExtractYear
+
+from .models import Department, Employee
+
+CACHE_TIMEOUT = 60 * 60 * 6  # Seconds; employee changes invalidate through the version
+VERSION_KEY = 'employee:analytics_version'
+PERCENTILES = {'p25': 0.25, 'p50': 0.5, 'p75': 0.75, 'p90': 0.9}
+HIRE_TREND_QUARTERS = 8  # Quarters of hiring history, the current one included
+OVERALL = 'overall'  # Key of the company-wide figures among the per-department ones
+
+
+class PercentileCont(Aggregate):
+    """PostgreSQL's continuous percentile, e.g. PercentileCont('salary', 0.5) for the median"""
+    function = 'percentile_cont'
+    template = '%(function)s(%(fraction)s) WITHIN GROUP (ORDER BY %(expressions)s)'
+    output_field = FloatField()
+
+    def __init__(self, expression, fraction, **extra):
+        super().__init__(expression, fraction=float(fraction), **extra)
+
+
+def analytics_version():
+    return cache.get_or_set(VERSION_KEY, 1, timeout=None)
+
+
+def invalidate_analytics():
+    try:
+        cache.incr(VERSION_KEY)
+    except ValueError:
+        cache.set(VERSION_KEY, 2, timeout=None)
+
+
+def department_analytics(today=None):
+    """The cached report; see build_analytics for its shape"""
+    today = today or date.today()
+    cache_key = f'employee:analytics:v{analytics_version()}:{today}'
+    report = cache.get(cache_key)
+    if report is None:
+        report = build_analytics(today)
+        cache.set(cache_key, report, CACHE_TIMEOUT)
+    return report
+
+
+def build_analytics(today):
+    """
+    {'quarters': ['2025-Q1', ...], 'overall': {...}, 'departments': [{'id', 'name', ...}]}
+    where every department (and 'overall') has headcount, salary_total,
+    salary_avg, salary_min, salary_max, the PERCENTILES and one hire count per
+    quarter. Employees without a department are listed with id None.
+    """
+    quarters = _quarters(today)
+    first_year, first_quarter = quarters[0]
+
+    salaries = {'headcount': Count('id'), 'salary_total': Sum('salary'), 'salary_avg': Avg('salary'),
+                'salary_min': Min('salary'), 'salary_max': Max('salary')}
+    employees = Employee.objects.order_by()
+    by_department = {
+        row.pop('department_id'): row
+        for row in employees.values('department_id').annotate(**salaries)
+    }
+    overall = employees.aggregate(**salaries)
+
+    percentiles = _percentiles(employees)
+
+    hires = defaultdict(dict)
+    hire_rows = employees.filter(hire_date__gte=date(first_year, 3 * first_quarter - 2, 1)).annotate(
+        year=ExtractYear('hire_date'), quarter=ExtractQuarter('hire_date'),
+    ).values('department_id', 'year', 'quarter').annotate(hires=Count('id'))
+    for row in hire_rows:
+        quarter = row['year'], row['quarter']
+        hires[row['department_id']][quarter] = row['hires']
+        hires[OVERALL][quarter] = hires[OVERALL].get(quarter, 0) + row['hires']
+
+    departments = list(Department.objects.order_by('name').values_list('id', 'name'))
+    if None in by_department:
+        departments.append((None, 'Unassigned'))
+
+    def figures(stats, department_id, hire_counts):
+        return {
+            'headcount': stats.get('headcount') or 0,
+            **{key: _number(stats.get(key)) for key in ('salary_total', 'salary_avg', 'salary_min', 'salary_max')},
+            **{key: _number(percentiles.get(department_id, {}).get(key)) for key in PERCENTILES},
+            'hires': [hire_counts.get(quarter, 0) for quarter in quarters],
+        }
+
+    return {
+        'quarters': [f'{year}-Q{quarter}' for year, quarter in quarters],
+        'overall': figures(overall, OVERALL, hires.get(OVERALL, {})),
+        'departments': [
+            {'id': department_id, 'name': name,
+             **figures(by_department.get(department_id, {}), department_id, hires.get(department_id, {}))}
+            for department_id, name in departments
+        ],
+    }
+
+
+def _percentiles(employees):
+    """{department_id or OVERALL: {'p25': value, ...}}"""
+    if connection.vendor == 'postgresql':
+        fractions = {key: PercentileCont('salary', fraction) for key, fraction in PERCENTILES.items()}
+        result = {row.pop('department_id'): row for row in employees.values('department_id').annotate(**fractions)}
+        result[OVERALL] = employees.aggregate(**fractions)
+        return result
+
+    pairs = list(employees.values_list('department_id', 'salary'))
+    if not pairs:
+        return {}
+    department_ids = np.array([-1 if pk is None else pk for pk, _ in pairs], dtype=np.int64)
+    salaries = np.array([salary for _, salary in pairs], dtype=np.float64)
+    fractions = np.array(list(PERCENTILES.values())) * 100
+    # Sort by department once and split into contiguous groups
+    order = np.argsort(department_ids, kind='stable')
+    department_ids, salaries = department_ids[order], salaries[order]
+    groups, starts = np.unique(department_ids, return_index=True)
+
+    result = {OVERALL: dict(zip(PERCENTILES, np.percentile(salaries, fractions)))}
+    for pk, group in zip(groups, np.split(salaries, starts[1:])):
+        result[None if pk == -1 else int(pk)] = dict(zip(PERCENTILES, np.percentile(group, fractions)))
+    return result
+
+
+def _quarters(today):
+    year, quarter = today.year, (today.month - 1) // 3 + 1
+    quarters = []
+    for _ in range(HIRE_TREND_QUARTERS):
+        quarters.append((year, quarter))
+        year, quarter = (year, quarter - 1) if quarter > 1 else (year - 1, 4)
+    return quarters[::-1]
+
+
+def _number(value):
+    return None if value is None else round(float(value), 2)
@@ -0,0 +1,339 @@
+import csv
+import os
+import secrets
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date
+from decimal import Decimal, InvalidOperation
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand, CommandError
+from django.core.validators import validate_email
+from django.db import transaction
+from django.db.models.functions import Lower
+
+from employee.analytics import invalidate_analytics
+from employee.models import Department, Employee, ReportingLine
+from hr.models import LeaveLedgerEntry
+
+User = get_user_model()
+
+REQUIRED_COLUMNS = ['employee_id', 'first_name', 'last_name', 'position', 'salary', 'hire_date']
+OPTIONAL_COLUMNS = [
+    'username', 'emailid', 'role', 'department', 'phone', 'address', 'time_zone', 'password', 'reports_to',
+]
+ROLES = {value for value, _ in User.ROLE_CHOICES}
+LOOKUP_CHUNK = 900  # Values per IN (...) lookup, under SQLite's parameter limit
+
+
+def _setup_worker():
+    # Workers started with spawn (macOS, Windows) need their own Django setup to hash
+    import django
+    from django.conf import settings
+
+    if not settings.configured:
+        os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'myproject.settings')
+        django.setup()
+
+
+def _hash_batch(secrets_batch):
+    return [make_password(secret) for secret in secrets_batch]
+
+
+class Command(BaseCommand):
+    help = (
+        'Onboard employees from a CSV file with a header row. Required columns: '
+        f'{", ".join(REQUIRED_COLUMNS)}; optional: {", ".join(OPTIONAL_COLUMNS)}. '
+        'The whole file is validated before anything is written; passwords (or one-time '
+        'tokens for rows without one) are hashed in parallel and users and employees '
+        'are bulk inserted in one transaction.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('csv_file', help='CSV file to import')
+        parser.add_argument('--credentials-out', help='Write the generated one-time tokens to this CSV file')
+        parser.add_argument('--create-departments', action='store_true',
+                            help='Create departments named in the file that do not exist yet')
+        parser.add_argument('--workers', type=int, default=os.cpu_count(), help='Password hashing processes')
+        parser.add_argument('--batch-size', type=int, default=1000, help='Rows per INSERT')
+        parser.add_argument('--dry-run', action='store_true', help='Validate the file and stop')
+
+    def handle(self, *args, **options):
+        started = time.monotonic()
+        try:
+            with open(options['csv_file'], newline='', encoding='utf-8-sig') as f:
+                reader = csv.DictReader(f)
+                missing = [column for column in REQUIRED_COLUMNS if column not in (reader.fieldnames or [])]
+                if missing:
+                    raise CommandError(f'Missing required columns: {", ".join(missing)}')
+                rows = [(reader.line_num, row) for row in reader]
+        except OSError as e:
+            raise CommandError(f'Cannot read {options["csv_file"]}: {e}')
+        if not rows:
+            raise CommandError('The file has no rows.')
+
+        records, errors = self.validate(rows, options['create_departments'])
+        if errors:
+            for line, message in errors:
+                self.stderr.write(f'line {line}: {message}')
+            raise CommandError(f'{len(errors)} problems in {len(rows)} rows; nothing was imported.')
+        validated = time.monotonic()
+        self.stdout.write(f'Validated {len(records)} rows in {validated - started:.1f}s.')
+        if options['dry_run']:
+            return
+
+        tokens = {}
+        for record in records:
+            if not record['password']:
+                record['password'] = tokens[record['username']] = secrets.token_urlsafe(12)
+        if tokens and not options['credentials_out']:
+            raise CommandError(
+                f'{len(tokens)} rows have no password; pass --credentials-out to receive their one-time tokens.'
+            )
+
+        hashes = self.hash_passwords([record['password'] for record in records], max(options['workers'] or 1, 1))
+        hashed = time.monotonic()
+        self.stdout.write(
+            f'Hashed {len(hashes)} passwords in {hashed - validated:.1f}s '
+            f'({len(hashes) / max(hashed - validated, 1e-9):.0f}/s).'
+        )
+
+        self.insert(records, hashes, options['batch_size'])
+        inserted = time.monotonic()
+
+        if tokens:
+            with open(options['credentials_out'], 'w', newline='', encoding='utf-8') as f:
+                writer = csv.writer(f)
+                writer.writerow(['username', 'one_time_password'])
+                writer.writerows(tokens.items())
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Onboarded {len(records)} employees in {inserted - started:.1f}s '
+            f'({len(records) / max(inserted - started, 1e-9):.0f} rows/s; insert {inserted - hashed:.1f}s).'
+        ))
+
+    def validate(self, rows, create_departments):
+        """Parse every row; returns (records, [(line, message), ...])"""
+        errors = []
+        records = []
+        seen = {'employee_id': {}, 'username': {}, 'emailid': {}}
+
+        for line, row in rows:
+            row = {key: (value or '').strip() for key, value in row.items() if key}
+            record = {
+                'line': line,
+                'employee_id': row.get('employee_id', ''),
+                'username': row.get('username') or row.get('employee_id', ''),
+                'first_name': row.get('first_name', ''),
+                'last_name': row.get('last_name', ''),
+                'emailid': row.get('emailid', '').lower() or None,
+                'role': row.get('role') or 'employee',
+                'department': row.get('department', ''),
+                'position': row.get('position', ''),
+                'phone': row.get('phone', ''),
+                'address': row.get('address', ''),
+                'time_zone': row.get('time_zone', ''),
+                'password': row.get('password', ''),
+                'reports_to': row.get('reports_to', ''),
+            }
+            problems = []
+            for column in REQUIRED_COLUMNS:
+                if not row.get(column):
+                    problems.append(f'{column} is required')
+            try:
+                record['salary'] = Decimal(row.get('salary', ''))
+                if record['salary'] < 0 or record['salary'] >= Decimal('1e8'):
+                    problems.append('salary is out of range')
+            except InvalidOperation:
+                if row.get('salary'):
+                    problems.append(f'salary {row["salary"]!r} is not a number')
+            try:
+                record['hire_date'] = date.fromisoformat(row.get('hire_date', ''))
+            except ValueError:
+                if row.get('hire_date'):
+                    problems.append(f'hire_date {row["hire_date"]!r} is not YYYY-MM-DD')
+            if record['emailid']:
+                try:
+                    validate_email(record['emailid'])
+                except ValidationError:
+                    problems.append(f'emailid {record["emailid"]!r} is not a valid email address')
+            if record['role'] not in ROLES:
+                problems.append(f'role {record["role"]!r} must be one of {", ".join(sorted(ROLES))}')
+            if record['time_zone']:
+                try:
+                    ZoneInfo(record['time_zone'])
+                except (ZoneInfoNotFoundError, ValueError):
+                    problems.append(f'time_zone {record["time_zone"]!r} is not a known time zone')
+            for field, limit in (('employee_id', 20), ('username', 150), ('first_name', 150),
+                                 ('last_name', 150), ('position', 100), ('phone', 20), ('time_zone', 63)):
+                if len(record[field]) > limit:
+                    problems.append(f'{field} is longer than {limit} characters')
+            for field, values in seen.items():
+                value = record[field]
+                if value and value in values:
+                    problems.append(f'{field} {value!r} repeats line {values[value]}')
+                elif value:
+                    values[value] = line
+
+            errors.extend((line, problem) for problem in problems)
+            records.append(record)
+
+        for field, queryset, column in (
+            ('employee_id', Employee.objects, 'employee_id'),
+            ('username', User.objects, 'username'),
+            # Emailids are unique case-insensitively; the CSV side is already lowercased
+            ('emailid', User.objects.annotate(emailid_lower=Lower('emailid')), 'emailid_lower'),
+        ):
+            taken = self.existing(queryset, column, list(seen[field]))
+            errors.extend(
+                (seen[field][value], f'{field} {value!r} already exists') for value in sorted(taken)
+            )
+
+        departments = {record['department'] for record in records if record['department']}
+        self.departments = dict(Department.objects.filter(name__in=departments).values_list('name', 'id'))
+        if not create_departments:
+            errors.extend(
+                (record['line'], f'department {record["department"]!r} does not exist')
+                for record in records
+                if record['department'] and record['department'] not in self.departments
+            )
+        self.new_departments = sorted(departments - set(self.departments))
+
+        managers = {record['reports_to'] for record in records if record['reports_to']}
+        self.managers = dict(self.existing_pairs(Employee.objects, 'employee_id', list(managers - set(seen['employee_id']))))
+        errors.extend(
+            (record['line'], f'reports_to {record["reports_to"]!r} is not an existing employee or one in this file')
+            for record in records
+            if record['reports_to']
+            and record['reports_to'] not in self.managers
+            and record['reports_to'] not in seen['employee_id']
+        )
+        errors.extend(self.reporting_cycles(records))
+
+        return records, sorted(errors)
+
+    def existing(self, queryset, column, values):
+        return {value for value, _ in self.existing_pairs(queryset, column, values)}
+
+    def existing_pairs(self, queryset, column, values):
+        pairs = []
+        for offset in range(0, len(values), LOOKUP_CHUNK):
+            pairs.extend(queryset.filter(**{f'{column}__in': values[offset:offset + LOOKUP_CHUNK]}).values_list(column, 'id'))
+        return pairs
+
+    def reporting_cycles(self, records):
+        parents = {record['employee_id']: record['reports_to'] for record in records}
+        lines = {record['employee_id']: record['line'] for record in records}
+        errors = []
+        for employee_id in parents:
+            seen, current = set(), employee_id
+            while current in parents and current not in seen:
+                seen.add(current)
+                current = parents[current]
+            if current == employee_id:
+                errors.append((lines[employee_id], f'reports_to forms a cycle through {employee_id!r}'))
+        return errors
+
+    def hash_passwords(self, passwords, workers):
+        if workers == 1 or len(passwords) < 2:
+            return _hash_batch(passwords)
+        size = max(len(passwords) // (workers * 4), 1)
+        batches = [passwords[offset:offset + size] for offset in range(0, len(passwords), size)]
+        with ProcessPoolExecutor(max_workers=workers, initializer=_setup_worker) as executor:
+            return [hashed for batch in executor.map(_hash_batch, batches) for hashed in batch]
+
+    def insert(self, records, hashes, batch_size):
+        with transaction.atomic():
+            departments = dict(self.departments)
+            if self.new_departments:
+                created = Department.objects.bulk_create([Department(name=name) for name in self.new_departments])
+                departments.update((department.name, department.id) for department in created)
+
+            users = User.objects.bulk_create(
+                [
+                    User(
+                        username=record['username'],
+                        password=password,
+                        first_name=record['first_name'],
+                        last_name=record['last_name'],
+                        email=record['emailid'] or '',
+                        emailid=record['emailid'],
+                        role=record['role'],
+                        phone=record['phone'],
+                        department=record['department'],
+                    )
+                    for record, password in zip(records, hashes)
+                ],
+                batch_size=batch_size,
+            )
+
+            employees = []
+            for record, user in zip(records, users):
+                employee = Employee(
+                    user=user,
+                    employee_id=record['employee_id'],
+                    department_id=departments.get(record['department']),
+                    position=record['position'],
+                    salary=record['salary'],
+                    hire_date=record['hire_date'],
+                    address=record['address'],
+                    phone=record['phone'],
+                    time_zone=record['time_zone'],
+                    reports_to_id=self.managers.get(record['reports_to']),
+                )
+                employee.department = Department(id=employee.department_id, name=record['department']) if employee.department_id else None
+                # bulk_create skips save(), so fill in what it would have
+                employee.search_text = employee.build_search_text()
+                employees.append(employee)
+            employees = Employee.objects.bulk_create(employees, batch_size=batch_size)
+
+            new_ids = {employee.employee_id: employee.id for employee in employees}
+            in_file = []
+            for record, employee in zip(records, employees):
+                if record['reports_to'] in new_ids:
+                    employee.reports_to_id = new_ids[record['reports_to']]
+                    in_file.append(employee)
+            Employee.objects.bulk_update(in_file, ['reports_to'], batch_size=batch_size)
+
+            ReportingLine.objects.bulk_create(self.reporting_lines(employees), batch_size=batch_size)
+            # bulk_create skips the post_save that credits new employees' opening leave balances
+            for offset in range(0, len(employees), batch_size):
+                LeaveLedgerEntry.objects.seed_opening_balances(
+                    employee.id for employee in employees[offset:offset + batch_size]
+                )
+            # bulk_create sends no post_save, so drop the cached department analytics here
+            transaction.on_commit(invalidate_analytics)
+
+    def reporting_lines(self, employees):
+        """Closure rows for the new employees: their in-file chain, then the existing manager's chain"""
+        parents = {employee.id: employee.reports_to_id for employee in employees}
+        existing_managers = {pk for pk in parents.values() if pk is not None and pk not in parents}
+        chains = {}
+        for manager_id in existing_managers:
+            chains[manager_id] = []
+        for offset in range(0, len(existing_managers), LOOKUP_CHUNK):
+            chunk = list(existing_managers)[offset:offset + LOOKUP_CHUNK]
+            for descendant_id, ancestor_id, depth in ReportingLine.objects.filter(
+                descendant_id__in=chunk,
+            ).values_list('descendant_id', 'ancestor_id', 'depth'):
+                chains[descendant_id].append((ancestor_id, depth))
+        for manager_id, chain in chains.items():
+            if not chain:
+                # An existing manager that was never linked
+                chain.append((manager_id, 0))
+
+        lines = []
+        for employee_id in parents:
+            depth, current = 0, employee_id
+            while current in parents:
+                lines.append(ReportingLine(ancestor_id=current, descendant_id=employee_id, depth=depth))
+                current, depth = parents[current], depth + 1
+            if current is not None:
+                lines.extend(
+                    ReportingLine(ancestor_id=ancestor_id, descendant_id=employee_id, depth=depth + up)
+                    for ancestor_id, up in chains[current]
+                )
+        return lines
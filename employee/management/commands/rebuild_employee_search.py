@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+from employee.models import Employee
+from employee.search import create_search_index, refresh_search_text
+
+
+class Command(BaseCommand):
+    help = (
+        'Recompute Employee.search_text for every employee and (re)create the directory '
+        'search index: pg_trgm GIN on PostgreSQL, the FTS5 table and its triggers on SQLite. '
+        'Run after bulk loads that bypass save() or schema changes that rebuild the table.'
+    )
+
+    def handle(self, *args, **options):
+        updated = refresh_search_text(Employee.objects.all())
+        create_search_index(connection)
+        self.stdout.write(self.style.SUCCESS(
+            f'Updated search text for {updated} employees and rebuilt the {connection.vendor} search index.'
+        ))
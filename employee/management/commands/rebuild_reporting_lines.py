@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from employee.models import ReportingLine
+
+
+class Command(BaseCommand):
+    help = (
+        'Recreate the reporting-hierarchy closure table from Employee.reports_to. '
+        'Run after bulk loads or raw updates that bypass Employee.save().'
+    )
+
+    def handle(self, *args, **options):
+        rows = ReportingLine.objects.rebuild()
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt the reporting hierarchy: {rows} closure rows.'))
@@ -0,0 +1,60 @@
+"""
+request.employee: the logged-in user's Employee, with its department.
+
+It is resolved lazily, on first access, with one query, and at most once per
+request; None for anonymous users and users without a profile, so views test
+it with `if not request.employee`. With settings.EMPLOYEE_PROFILE_CACHE_TIMEOUT
+set, the profile is also cached per user under a version; saving or deleting
+the employee and changing any department invalidate it (see signals.py). The
+default cache is per process, so keep the timeout short with several workers.
+"""
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.functional import SimpleLazyObject
+
+from .models import Employee
+
+VERSION_KEY = 'employee:profile_version'
+
+
+def _profile_key(user_id):
+    version = cache.get_or_set(VERSION_KEY, 1, timeout=None)
+    return f'employee:profile:{user_id}:v{version}'
+
+
+def invalidate_profile(user_id):
+    cache.delete(_profile_key(user_id))
+
+
+def invalidate_all_profiles():
+    try:
+        cache.incr(VERSION_KEY)
+    except ValueError:
+        cache.set(VERSION_KEY, 2, timeout=None)
+
+
+def get_employee(user):
+    if not user.is_authenticated:
+        return None
+    timeout = getattr(settings, 'EMPLOYEE_PROFILE_CACHE_TIMEOUT', 0)
+    key = _profile_key(user.pk) if timeout else None
+    employee = cache.get(key) if key else None
+    if employee is None:
+        try:
+            employee = Employee.objects.select_related('department').get(user=user)
+        except Employee.DoesNotExist:
+            return None
+        if key:
+            cache.set(key, employee, timeout)
+    # Already loaded by AuthenticationMiddleware; saves a query on employee.user
+    employee.user = user
+    return employee
+
+
+class EmployeeMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        request.employee = SimpleLazyObject(lambda: get_employee(request.user))
+        return self.get_response(request)
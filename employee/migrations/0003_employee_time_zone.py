@@ -0,0 +1,18 @@
+# Generated by Django 5.1 on 2026-10-18 11:15
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('employee', '0002_employee_hire_date_idx'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='employee',
+            name='time_zone',
+            field=models.CharField(blank=True, help_text='IANA time zone, e.g. Asia/Kolkata; blank uses the server time zone', max_length=63),
+        ),
+    ]
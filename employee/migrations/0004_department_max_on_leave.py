@@ -0,0 +1,18 @@
+# Generated by Django 5.1 on 2026-10-18 11:18
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('employee', '0003_employee_time_zone'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='department',
+            name='max_on_leave',
+            field=models.PositiveIntegerField(blank=True, help_text='Most employees allowed on approved leave on the same day; blank for no limit', null=True),
+        ),
+    ]
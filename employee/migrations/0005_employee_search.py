@@ -0,0 +1,51 @@
+# Generated by Django 5.1 on 2026-10-18 11:28
+
+from django.conf import settings
+from django.db import migrations, models
+
+from employee import search
+
+
+def fill_search_text(apps, schema_editor):
+    Employee = apps.get_model('employee', 'Employee')
+    employees = Employee.objects.select_related('user', 'department').order_by('id')
+    batch = []
+    for employee in employees.iterator(chunk_size=1000):
+        user = employee.user
+        parts = [
+            user.first_name, user.last_name, user.username, employee.employee_id,
+            user.emailid or user.email, employee.position,
+            employee.department.name if employee.department_id else '',
+        ]
+        employee.search_text = ' '.join(part for part in parts if part).lower()
+        batch.append(employee)
+        if len(batch) >= 1000:
+            Employee.objects.bulk_update(batch, ['search_text'])
+            batch = []
+    Employee.objects.bulk_update(batch, ['search_text'])
+
+
+def add_search_index(apps, schema_editor):
+    search.create_search_index(schema_editor.connection)
+
+
+def remove_search_index(apps, schema_editor):
+    search.drop_search_index(schema_editor.connection)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('employee', '0004_department_max_on_leave'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='employee',
+            name='search_text',
+            field=models.TextField(blank=True, editable=False, help_text='Lowercased searchable fields, indexed for the directory search'),
+        ),
+        migrations.RunPython(fill_search_text, migrations.RunPython.noop),
+        migrations.RunPython(add_search_index, remove_search_index),
+    ]
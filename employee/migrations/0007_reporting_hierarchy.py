@@ -0,0 +1,43 @@
+# Generated by Django 5.1 on 2026-10-18 11:33
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def add_self_links(apps, schema_editor):
+    # Nobody reports to anyone yet, so every employee is only linked to themselves
+    Employee = apps.get_model('employee', 'Employee')
+    ReportingLine = apps.get_model('employee', 'ReportingLine')
+    ReportingLine.objects.bulk_create(
+        [ReportingLine(ancestor_id=pk, descendant_id=pk, depth=0) for pk in Employee.objects.values_list('id', flat=True)],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('employee', '0006_employee_list_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='employee',
+            name='reports_to',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='direct_reports', to='employee.employee'),
+        ),
+        migrations.CreateModel(
+            name='ReportingLine',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('depth', models.PositiveIntegerField()),
+                ('ancestor', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='descendant_links', to='employee.employee')),
+                ('descendant', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='ancestor_links', to='employee.employee')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['descendant', 'depth'], name='employee_line_desc_depth_idx')],
+                'unique_together': {('ancestor', 'descendant')},
+            },
+        ),
+        migrations.RunPython(add_self_links, migrations.RunPython.noop),
+    ]
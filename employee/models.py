@@ -1,4 +1,6 @@
-from django.db import models
+from django.core.exceptions import ValidationError
+from django.db import models, transaction
+from django.db.models import Count, Q
 from django.contrib.auth import get_user_model
 
 User = get_user_model()
@@ -7,10 +9,26 @@ class Department(models.Model):
     name = models.CharField(max_length=100)
     description = models.TextField(blank=True)
     manager = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True, related_name='managed_departments')
+    max_on_leave = models.PositiveIntegerField(null=True, blank=True, help_text="Most employees allowed on approved leave on the same day; blank for no limit")
 
     def __str__(self):
         return self.name
 
+class EmployeeQuerySet(models.QuerySet):
+    def reports_of(self, employee):
+        """Everyone under employee in the reporting hierarchy, at any depth"""
+        return self.filter(ancestor_links__ancestor=employee, ancestor_links__depth__gt=0)
+
+    def chain_of(self, employee):
+        """employee's managers, from their direct manager up to the top"""
+        return self.filter(
+            descendant_links__descendant=employee, descendant_links__depth__gt=0,
+        ).order_by('descendant_links__depth')
+
+    def with_headcount(self):
+        """Annotate headcount: the number of people under each employee, at any depth"""
+        return self.annotate(headcount=Count('descendant_links', filter=Q(descendant_links__depth__gt=0)))
+
 class Employee(models.Model):
     user = models.OneToOneField(User, on_delete=models.CASCADE)
     employee_id = models.CharField(max_length=20, unique=True)
@@ -20,6 +38,126 @@ class Employee(models.Model):
     hire_date = models.DateField()
     address = models.TextField(blank=True)
     phone = models.CharField(max_length=20, blank=True)
+    time_zone = models.CharField(max_length=63, blank=True, help_text="IANA time zone, e.g. Asia/Kolkata; blank uses the server time zone")
+    search_text = models.TextField(blank=True, editable=False, help_text="Lowercased searchable fields, indexed for the directory search")
+    reports_to = models.ForeignKey('self', on_delete=models.SET_NULL, null=True, blank=True, related_name='direct_reports')
+
+    objects = EmployeeQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['-hire_date'], name='employee_hire_date_idx'),
+            # Keyset pagination of the employee list, and its position filter
+            models.Index(fields=['-hire_date', '-id'], name='employee_hire_date_id_idx'),
+            models.Index(fields=['position'], name='employee_position_idx'),
+        ]
 
     def __str__(self):
         return f"{self.user.get_full_name()} - {self.employee_id}"
+
+    def clean(self):
+        if self.reports_to_id is not None and self.pk is not None:
+            if self.reports_to_id == self.pk or ReportingLine.objects.filter(
+                ancestor_id=self.pk, descendant_id=self.reports_to_id,
+            ).exists():
+                raise ValidationError({'reports_to': 'An employee cannot report to themselves or to someone under them.'})
+
+    def build_search_text(self):
+        user = self.user
+        department = self.department.name if self.department_id else ''
+        parts = [
+            user.first_name, user.last_name, user.username, self.employee_id,
+            user.emailid or user.email, self.position, department,
+        ]
+        return ' '.join(part for part in parts if part).lower()
+
+    def save(self, *args, **kwargs):
+        self.search_text = self.build_search_text()
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'search_text' not in update_fields:
+            kwargs['update_fields'] = [*update_fields, 'search_text']
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            if update_fields is None or 'reports_to' in update_fields:
+                ReportingLine.objects.sync(self)
+
+class ReportingLineManager(models.Manager):
+    BATCH_SIZE = 1000
+
+    def sync(self, employee):
+        """Bring the closure table in line with employee.reports_to, if it has changed"""
+        links = dict(self.filter(descendant_id=employee.pk, depth__lte=1).values_list('depth', 'ancestor_id'))
+        if 0 in links and links.get(1) == employee.reports_to_id:
+            return
+        self.move(employee.pk, employee.reports_to_id)
+
+    def move(self, employee_id, manager_id):
+        """
+        Re-link employee_id and everyone under them below manager_id (None for
+        the top): delete every link from the old managers into the subtree, then
+        insert the new manager's chain crossed with the subtree, depths added.
+        """
+        with transaction.atomic():
+            subtree = list(self.filter(ancestor_id=employee_id).values_list('descendant_id', 'depth'))
+            if not subtree:
+                # Not linked yet: new, or created by bulk_create
+                self.create(ancestor_id=employee_id, descendant_id=employee_id, depth=0)
+                subtree = [(employee_id, 0)]
+            if manager_id is not None and manager_id in {pk for pk, _ in subtree}:
+                raise ValidationError('An employee cannot report to themselves or to someone under them.')
+
+            subtree_ids = self.filter(ancestor_id=employee_id).values('descendant_id')
+            self.filter(descendant_id__in=subtree_ids).exclude(ancestor_id__in=subtree_ids).delete()
+            if manager_id is None:
+                return
+
+            chain = list(self.filter(descendant_id=manager_id).values_list('ancestor_id', 'depth'))
+            if not chain:
+                self.create(ancestor_id=manager_id, descendant_id=manager_id, depth=0)
+                chain = [(manager_id, 0)]
+            self.bulk_create(
+                [
+                    self.model(ancestor_id=ancestor_id, descendant_id=descendant_id, depth=up + down + 1)
+                    for ancestor_id, up in chain
+                    for descendant_id, down in subtree
+                ],
+                batch_size=self.BATCH_SIZE,
+            )
+
+    def rebuild(self):
+        """Recreate the whole table from Employee.reports_to; returns the number of rows"""
+        parents = dict(Employee.objects.values_list('id', 'reports_to_id'))
+        lines = []
+        for employee_id in parents:
+            depth, ancestor_id, seen = 0, employee_id, set()
+            # seen stops at cycles left by edits that bypassed save()
+            while ancestor_id is not None and ancestor_id not in seen:
+                seen.add(ancestor_id)
+                lines.append(self.model(ancestor_id=ancestor_id, descendant_id=employee_id, depth=depth))
+                ancestor_id, depth = parents.get(ancestor_id), depth + 1
+        with transaction.atomic():
+            self.all().delete()
+            self.bulk_create(lines, batch_size=self.BATCH_SIZE)
+        return len(lines)
+
+class ReportingLine(models.Model):
+    """
+    Closure table of Employee.reports_to: one row for every (manager, report)
+    pair at any depth, plus a depth-0 row from each employee to itself.
+    Kept in step by Employee.save(); rebuild with rebuild_reporting_lines.
+    """
+    ancestor = models.ForeignKey(Employee, on_delete=models.CASCADE, related_name='descendant_links')
+    descendant = models.ForeignKey(Employee, on_delete=models.CASCADE, related_name='ancestor_links')
+    depth = models.PositiveIntegerField()
+
+    objects = ReportingLineManager()
+
+    class Meta:
+        unique_together = ['ancestor', 'descendant']
+        indexes = [
+            # Chain of command: walk up from a descendant in depth order
+            models.Index(fields=['descendant', 'depth'], name='employee_line_desc_depth_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.ancestor_id} > {self.descendant_id} ({self.depth})"
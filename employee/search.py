@@ -0,0 +1,159 @@
+"""
+Employee directory search.
+
+Every Employee carries search_text, a lowercased copy of the name, username,
+employee ID, email, position and department name, kept up to date on save (see
+signals.py for changes made through the user or the department). It is
+indexed per database:
+
+- PostgreSQL: a pg_trgm GIN index, so every search term is a substring match
+  (ILIKE '%term%') served by the index and results are ranked by similarity.
+- SQLite: an external-content FTS5 table, employee_search, kept in step by
+  triggers; every term is a prefix match and results are ranked by bm25.
+  Django rebuilds a SQLite table for most schema changes, which drops its
+  triggers, so they are re-created after every migrate (ensure_search_index).
+- Anything else falls back to unindexed icontains.
+"""
+import re
+
+from django.db import connection
+from django.db.models.expressions import RawSQL
+
+from .models import Employee
+
+FTS_TABLE = 'employee_search'
+FTS_TRIGGERS = [f'{FTS_TABLE}_insert', f'{FTS_TABLE}_delete', f'{FTS_TABLE}_update']
+SEARCH_BATCH_SIZE = 1000
+RANK_CANDIDATES = 500  # Matches scored for a typeahead query on SQLite
+
+_TERM = re.compile(r'\w+', re.UNICODE)
+
+
+def create_search_index(connection):
+    """Index search_text; SQLite table rebuilds drop the triggers, so this is re-runnable"""
+    with connection.cursor() as cursor:
+        if connection.vendor == 'postgresql':
+            cursor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+            cursor.execute(
+                'CREATE INDEX IF NOT EXISTS employee_search_trgm ON employee_employee '
+                'USING gin (search_text gin_trgm_ops)'
+            )
+        elif connection.vendor == 'sqlite':
+            cursor.execute(
+                f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5("
+                f"search_text, content='employee_employee', content_rowid='id', prefix='2 3 4')"
+            )
+            cursor.execute(
+                f"CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_insert AFTER INSERT ON employee_employee BEGIN "
+                f"INSERT INTO {FTS_TABLE}(rowid, search_text) VALUES (new.id, new.search_text); END"
+            )
+            cursor.execute(
+                f"CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_delete AFTER DELETE ON employee_employee BEGIN "
+                f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, search_text) "
+                f"VALUES ('delete', old.id, old.search_text); END"
+            )
+            cursor.execute(
+                f"CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_update AFTER UPDATE OF search_text ON employee_employee BEGIN "
+                f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, search_text) "
+                f"VALUES ('delete', old.id, old.search_text); "
+                f"INSERT INTO {FTS_TABLE}(rowid, search_text) VALUES (new.id, new.search_text); END"
+            )
+            cursor.execute(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')")
+
+
+def ensure_search_index(connection):
+    """Re-create the SQLite triggers (and resync the index) if a table rebuild dropped them"""
+    if connection.vendor != 'sqlite':
+        return False
+    with connection.cursor() as cursor:
+        columns = [column.name for column in connection.introspection.get_table_description(cursor, 'employee_employee')]
+        if 'search_text' not in columns:
+            return False  # Migrated back past 0005
+        cursor.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'trigger' AND tbl_name = 'employee_employee'"
+        )
+        if set(FTS_TRIGGERS) <= {row[0] for row in cursor.fetchall()}:
+            return False
+    create_search_index(connection)
+    return True
+
+
+def drop_search_index(connection):
+    with connection.cursor() as cursor:
+        if connection.vendor == 'postgresql':
+            cursor.execute('DROP INDEX IF EXISTS employee_search_trgm')
+        elif connection.vendor == 'sqlite':
+            for trigger in FTS_TRIGGERS:
+                cursor.execute(f'DROP TRIGGER IF EXISTS {trigger}')
+            cursor.execute(f'DROP TABLE IF EXISTS {FTS_TABLE}')
+
+
+def search_terms(query):
+    return _TERM.findall(query.lower())[:8]
+
+
+def _fts_match(terms):
+    # "term"* is a prefix query; quoting keeps FTS5 syntax characters literal
+    return ' '.join(f'"{term}"*' for term in terms)
+
+
+def filter_employees(employees, query):
+    """Narrow a queryset to the employees matching every term in query, without ranking"""
+    terms = search_terms(query)
+    if not terms:
+        return employees
+    if connection.vendor == 'sqlite':
+        return employees.filter(id__in=RawSQL(
+            f'SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s', [_fts_match(terms)],
+        ))
+    for term in terms:
+        employees = employees.filter(search_text__icontains=term)
+    return employees
+
+
+def search_employee_ids(query, limit=10):
+    """Ids of the best limit matches for every term in query, best first"""
+    terms = search_terms(query)
+    if not terms:
+        return []
+
+    if connection.vendor == 'sqlite':
+        with connection.cursor() as cursor:
+            # Rank a bounded candidate set so a one-letter query doesn't score every row
+            cursor.execute(
+                f'SELECT rowid FROM (SELECT rowid, rank FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s LIMIT %s) '
+                f'ORDER BY rank LIMIT %s',
+                [_fts_match(terms), RANK_CANDIDATES, limit],
+            )
+            return [row[0] for row in cursor.fetchall()]
+
+    employees = filter_employees(Employee.objects.all(), query)
+    if connection.vendor == 'postgresql':
+        from django.contrib.postgres.search import TrigramSimilarity
+
+        employees = employees.annotate(
+            similarity=TrigramSimilarity('search_text', ' '.join(terms)),
+        ).order_by('-similarity', 'id')
+    else:
+        employees = employees.order_by('id')
+    return list(employees.values_list('id', flat=True)[:limit])
+
+
+def refresh_search_text(employees):
+    """Recompute search_text for a queryset of employees, in batches"""
+    employees = employees.select_related('user', 'department').order_by('id')
+    batch = []
+    updated = 0
+    for employee in employees.iterator(chunk_size=SEARCH_BATCH_SIZE):
+        text = employee.build_search_text()
+        if text != employee.search_text:
+            employee.search_text = text
+            batch.append(employee)
+        if len(batch) >= SEARCH_BATCH_SIZE:
+            Employee.objects.bulk_update(batch, ['search_text'])
+            updated += len(batch)
+            batch = []
+    if batch:
+        Employee.objects.bulk_update(batch, ['search_text'])
+        updated += len(batch)
+    return updated
@@ -0,0 +1,78 @@
+from django.contrib.auth import get_user_model
+from django.db import connections, transaction
+from django.db.models.signals import post_delete, post_migrate, post_save, pre_delete, pre_save
+from django.dispatch import receiver
+from .analytics import invalidate_analytics
+from .middleware import invalidate_all_profiles, invalidate_profile
+from .models import Department, Employee, ReportingLine
+from .search import ensure_search_index, refresh_search_text
+
+USER_SEARCH_FIELDS = {'first_name', 'last_name', 'username', 'email', 'emailid'}
+ANALYTICS_FIELDS = {'salary', 'department', 'department_id', 'hire_date'}
+
+def _touches(update_fields, fields):
+    return update_fields is None or bool(fields & set(update_fields))
+
+@receiver(post_save, sender=get_user_model())
+def refresh_user_search_text(sender, instance, created, update_fields=None, **kwargs):
+    """Names, username and email live on the user; last_login updates and the like are skipped"""
+    if not created and _touches(update_fields, USER_SEARCH_FIELDS):
+        refresh_search_text(Employee.objects.filter(user=instance))
+
+@receiver(post_save, sender=Department)
+def refresh_department_search_text(sender, instance, created, update_fields=None, **kwargs):
+    if not created and _touches(update_fields, {'name'}):
+        refresh_search_text(Employee.objects.filter(department=instance))
+
+@receiver(post_migrate)
+def restore_search_triggers(sender, using, **kwargs):
+    """An AlterField on Employee rebuilds its SQLite table and drops the FTS triggers with it"""
+    if sender.name == 'employee':
+        ensure_search_index(connections[using])
+
+@receiver(pre_delete, sender=Employee)
+def detach_direct_reports(sender, instance, **kwargs):
+    """reports_to is SET_NULL without save(), so move the subtrees to the top level here"""
+    for report_id in instance.direct_reports.values_list('id', flat=True):
+        ReportingLine.objects.move(report_id, None)
+
+@receiver(pre_save, sender=Employee)
+def check_analytics_fields(sender, instance, update_fields=None, **kwargs):
+    """Profile edits that leave salary, department and hire date alone keep the analytics cache"""
+    instance._analytics_changed = instance.pk is None or (
+        _touches(update_fields, ANALYTICS_FIELDS)
+        and not Employee.objects.filter(
+            pk=instance.pk, salary=instance.salary,
+            department_id=instance.department_id, hire_date=instance.hire_date,
+        ).exists()
+    )
+
+@receiver(post_save, sender=Employee)
+def invalidate_analytics_on_save(sender, instance, created, **kwargs):
+    if created or getattr(instance, '_analytics_changed', True):
+        transaction.on_commit(invalidate_analytics)
+
+@receiver(post_delete, sender=Employee)
+def invalidate_analytics_on_delete(sender, instance, **kwargs):
+    transaction.on_commit(invalidate_analytics)
+
+@receiver(post_save, sender=Department)
+def invalidate_analytics_on_department_save(sender, instance, created, update_fields=None, **kwargs):
+    if created or _touches(update_fields, {'name'}):
+        transaction.on_commit(invalidate_analytics)
+
+@receiver(post_delete, sender=Department)
+def invalidate_analytics_on_department_delete(sender, instance, **kwargs):
+    transaction.on_commit(invalidate_analytics)
+
+@receiver(post_save, sender=Employee)
+@receiver(post_delete, sender=Employee)
+def invalidate_cached_profile(sender, instance, **kwargs):
+    user_id = instance.user_id
+    transaction.on_commit(lambda: invalidate_profile(user_id))
+
+@receiver(post_save, sender=Department)
+@receiver(post_delete, sender=Department)
+def invalidate_cached_profiles(sender, instance, **kwargs):
+    """Cached profiles carry their department"""
+    transaction.on_commit(invalidate_all_profiles)
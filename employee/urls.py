@@ -3,6 +3,9 @@ from . import views
 
 urlpatterns = [
     path('', views.employee_list, name='employee_list'),
+    path('search/', views.employee_search, name='employee_search'),
     path('<int:pk>/', views.employee_detail, name='employee_detail'),
     path('departments/', views.department_list, name='department_list'),
+    path('departments/analytics/', views.department_analytics_report, name='department_analytics'),
+    path('departments/analytics/data/', views.department_analytics_data, name='department_analytics_data'),
 ]
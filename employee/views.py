@@ -1,7 +1,24 @@
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
+from django.db.models import Q
+from django.http import JsonResponse
+from django.utils.cache import patch_cache_control
+from datetime import date
+from urllib.parse import urlencode
+from .analytics import department_analytics
 from .models import Employee, Department
+from .search import filter_employees, search_employee_ids
+
+EMPLOYEE_PAGE_SIZE = 24  # Employee cards per page
+# Columns the employee cards display; nothing else is loaded
+EMPLOYEE_CARD_FIELDS = [
+    'employee_id', 'position', 'hire_date', 'salary', 'department__name',
+    'user__first_name', 'user__last_name', 'user__username', 'user__emailid',
+]
+
+TYPEAHEAD_LIMIT = 10  # Default number of typeahead suggestions
+TYPEAHEAD_MAX_LIMIT = 50
 
 @login_required
 def employee_list(request):
@@ -9,13 +26,94 @@ def employee_list(request):
         messages.error(request, 'You do not have permission to view employee list.')
         return redirect('dashboard')
 
-    employees = Employee.objects.select_related('user', 'department').all()
-    departments = Department.objects.all()
+    filters = {
+        'q': request.GET.get('q', '').strip(),
+        'department': request.GET.get('department', ''),
+        'position': request.GET.get('position', ''),
+        'hired_from': request.GET.get('hired_from', ''),
+        'hired_to': request.GET.get('hired_to', ''),
+    }
+    employees = Employee.objects.all()
+    try:
+        if filters['q']:
+            employees = filter_employees(employees, filters['q'])
+        if filters['department']:
+            employees = employees.filter(department_id=int(filters['department']))
+        if filters['position']:
+            employees = employees.filter(position=filters['position'])
+        if filters['hired_from']:
+            employees = employees.filter(hire_date__gte=date.fromisoformat(filters['hired_from']))
+        if filters['hired_to']:
+            employees = employees.filter(hire_date__lte=date.fromisoformat(filters['hired_to']))
+    except ValueError:
+        messages.error(request, 'Invalid filter: pick a department from the list and give dates as YYYY-MM-DD.')
+        return redirect('employee_list')
+
+    page, next_cursor = _employee_page(employees, request.GET.get('after'))
+    departments = list(Department.objects.order_by('name').values('id', 'name'))
+
     return render(request, 'employee/employee_list.html', {
-        'employees': employees,
-        'departments': departments
+        'employees': page,
+        'employees_count': employees.count(),
+        'departments': departments,
+        'departments_count': len(departments),
+        'positions': Employee.objects.order_by('position').values_list('position', flat=True).distinct(),
+        'filters': filters,
+        'query': filters['q'],
+        'filter_query': urlencode({key: value for key, value in filters.items() if value}),
+        'next_cursor': next_cursor,
+        'is_first_page': not request.GET.get('after'),
     })
 
+def _employee_page(employees, after=None):
+    """A page of employees, most recently hired first, after an optional cursor, plus the next page's cursor"""
+    if after:
+        try:
+            hire_date, pk = after.rsplit('_', 1)
+            hire_date, pk = date.fromisoformat(hire_date), int(pk)
+        except ValueError:
+            pass
+        else:
+            employees = employees.filter(
+                Q(hire_date__lt=hire_date) | Q(hire_date=hire_date, id__lt=pk)
+            )
+    rows = list(
+        employees.select_related('user', 'department')
+        .only(*EMPLOYEE_CARD_FIELDS)
+        .order_by('-hire_date', '-id')[:EMPLOYEE_PAGE_SIZE + 1]
+    )
+    page = rows[:EMPLOYEE_PAGE_SIZE]
+    next_cursor = f'{page[-1].hire_date.isoformat()}_{page[-1].id}' if len(rows) > EMPLOYEE_PAGE_SIZE else None
+    return page, next_cursor
+
+@login_required
+def employee_search(request):
+    """Typeahead: the best directory matches for ?q=, as JSON"""
+    if not (request.user.role == 'hr' or request.user.is_staff):
+        return JsonResponse({'error': 'You do not have permission to search employees.'}, status=403)
+
+    try:
+        limit = min(int(request.GET.get('limit', TYPEAHEAD_LIMIT)), TYPEAHEAD_MAX_LIMIT)
+    except ValueError:
+        limit = TYPEAHEAD_LIMIT
+    ids = search_employee_ids(request.GET.get('q', ''), max(limit, 1))
+    rows = Employee.objects.filter(id__in=ids).values(
+        'id', 'employee_id', 'position', 'user__first_name', 'user__last_name',
+        'user__username', 'department__name',
+    )
+    by_id = {row['id']: row for row in rows}
+    results = [
+        {
+            'id': pk,
+            'employee_id': by_id[pk]['employee_id'],
+            'name': f"{by_id[pk]['user__first_name']} {by_id[pk]['user__last_name']}".strip() or by_id[pk]['user__username'],
+            'position': by_id[pk]['position'],
+            'department': by_id[pk]['department__name'],
+        }
+        for pk in ids if pk in by_id
+    ]
+    return JsonResponse({'results': results})
+
 @login_required
 def employee_detail(request, pk):
     # Handle employee switcher from dashboard
@@ -30,3 +128,28 @@ def employee_detail(request, pk):
 def department_list(request):
     departments = Department.objects.all()
     return render(request, 'employee/department_list.html', {'departments': departments})
+
+@login_required
+def department_analytics_report(request):
+    """Headcount, salary distribution and hiring per department, for HR"""
+    if not (request.user.role == 'hr' or request.user.is_staff):
+        messages.error(request, 'You do not have permission to view department analytics.')
+        return redirect('dashboard')
+
+    report = department_analytics()
+    peak = max([hires for row in report['departments'] for hires in row['hires']], default=0)
+    context = {
+        'report': report,
+        'peak_hires': peak,
+    }
+    return render(request, 'employee/department_analytics.html', context)
+
+@login_required
+def department_analytics_data(request):
+    """JSON form of department_analytics_report"""
+    if not (request.user.role == 'hr' or request.user.is_staff):
+        return JsonResponse({'error': 'You do not have permission to view department analytics.'}, status=403)
+
+    response = JsonResponse(department_analytics())
+    patch_cache_control(response, private=True, max_age=60)
+    return response
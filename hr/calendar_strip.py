@@ -0,0 +1,76 @@
+"""
+Compact encodings of a month of attendance for the HR calendar strip.
+
+Each day is a 3-bit code (see STATUS_CODES). The packed form stores day 1 in
+the lowest three bits of a little-endian integer, day 2 in the next three and
+so on, then base64-encodes the bytes: a 31-day month is 12 bytes, 16 characters.
+The string form uses one character per day from STATUS_LETTERS.
+"""
+import base64
+
+from django.core.cache import cache
+
+STATUS_CODES = {
+    None: 0,
+    'present': 1,
+    'absent': 2,
+    'late': 3,
+    'half_day': 4,
+}
+STATUS_LETTERS = '-PALH'
+BITS_PER_DAY = 3
+
+
+def pack_month(statuses, days):
+    """Base64 bitmap of a {day of month: status} mapping"""
+    packed = 0
+    for day, status in statuses.items():
+        packed |= STATUS_CODES.get(status, 0) << (BITS_PER_DAY * (day - 1))
+    length = (days * BITS_PER_DAY + 7) // 8
+    return base64.b64encode(packed.to_bytes(length, 'little')).decode('ascii')
+
+
+def unpack_month(encoded, days):
+    """Inverse of pack_month, returning a list of status codes for days 1..days"""
+    packed = int.from_bytes(base64.b64decode(encoded), 'little')
+    mask = (1 << BITS_PER_DAY) - 1
+    return [(packed >> (BITS_PER_DAY * day)) & mask for day in range(days)]
+
+
+def month_string(statuses, days):
+    """One STATUS_LETTERS character per day of a {day of month: status} mapping"""
+    return ''.join(STATUS_LETTERS[STATUS_CODES.get(statuses.get(day), 0)] for day in range(1, days + 1))
+
+
+ROSTER_VERSION_KEY = 'hr:attendance_calendar:roster_version'
+
+
+def _version_key(year, month):
+    return f'hr:attendance_calendar:version:{year}-{month:02d}'
+
+
+def month_version(year, month):
+    return cache.get_or_set(_version_key(year, month), 1, timeout=None)
+
+
+def invalidate_months(months):
+    """Bump the cache version of every (year, month) so cached calendars are ignored"""
+    for year, month in set(months):
+        key = _version_key(year, month)
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, 2, timeout=None)
+
+
+def roster_version():
+    """Version of who is on the calendar pages and under what name, for every month"""
+    return cache.get_or_set(ROSTER_VERSION_KEY, 1, timeout=None)
+
+
+def invalidate_roster():
+    """Employees were added, removed, renamed or moved between departments"""
+    try:
+        cache.incr(ROSTER_VERSION_KEY)
+    except ValueError:
+        cache.set(ROSTER_VERSION_KEY, 2, timeout=None)
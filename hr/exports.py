@@ -0,0 +1,196 @@
+"""
+Streaming CSV and XLSX exports of Attendance and LeaveRequest.
+
+Rows are read with values_list(...).iterator() across the employee, user and
+department joins, and every writer is a generator that yields encoded chunks as
+it goes, so memory use doesn't depend on the number of rows. XLSX is produced
+without third-party libraries: a minimal SpreadsheetML package written through
+zipfile onto a non-seekable buffer that is drained after every batch of rows.
+"""
+import csv
+import zipfile
+from decimal import Decimal
+from xml.sax.saxutils import escape
+
+from .models import Attendance, LeaveRequest
+
+CHUNK_SIZE = 2000
+
+ATTENDANCE_COLUMNS = [
+    ('Employee ID', 'employee__employee_id'),
+    ('First Name', 'employee__user__first_name'),
+    ('Last Name', 'employee__user__last_name'),
+    ('Department', 'employee__department__name'),
+    ('Date', 'date'),
+    ('Status', 'status'),
+    ('Check In', 'check_in_time'),
+    ('Check Out', 'check_out_time'),
+    ('Working Hours', 'working_hours'),
+    ('Overtime Hours', 'overtime_hours'),
+    ('Notes', 'notes'),
+]
+
+LEAVE_COLUMNS = [
+    ('Employee ID', 'employee__employee_id'),
+    ('First Name', 'employee__user__first_name'),
+    ('Last Name', 'employee__user__last_name'),
+    ('Department', 'employee__department__name'),
+    ('Leave Type', 'leave_type'),
+    ('Start Date', 'start_date'),
+    ('End Date', 'end_date'),
+    ('Status', 'status'),
+    ('Approved By', 'approved_by__username'),
+    ('Created At', 'created_at'),
+    ('Reason', 'reason'),
+]
+
+
+def attendance_rows(start=None, end=None, department=None, status=None):
+    rows = Attendance.objects.order_by('date', 'employee_id')
+    if start:
+        rows = rows.filter(date__gte=start)
+    if end:
+        rows = rows.filter(date__lte=end)
+    if department:
+        rows = rows.filter(employee__department_id=department)
+    if status:
+        rows = rows.filter(status=status)
+    return ATTENDANCE_COLUMNS, rows.values_list(*[field for _, field in ATTENDANCE_COLUMNS])
+
+
+def leave_rows(start=None, end=None, department=None, status=None):
+    """Leave requests overlapping [start, end]"""
+    rows = LeaveRequest.objects.order_by('start_date', 'id')
+    if start:
+        rows = rows.filter(end_date__gte=start)
+    if end:
+        rows = rows.filter(start_date__lte=end)
+    if department:
+        rows = rows.filter(employee__department_id=department)
+    if status:
+        rows = rows.filter(status=status)
+    return LEAVE_COLUMNS, rows.values_list(*[field for _, field in LEAVE_COLUMNS])
+
+
+class _Buffer:
+    """Write-only file object whose contents are drained by the generator that owns it"""
+
+    def __init__(self):
+        self.chunks = []
+        self.position = 0
+
+    def write(self, data):
+        self.chunks.append(bytes(data))
+        self.position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self.position
+
+    def flush(self):
+        pass
+
+    def drain(self):
+        data = b''.join(self.chunks)
+        self.chunks = []
+        return data
+
+
+class _Echo:
+    def write(self, value):
+        return value
+
+
+def stream_csv(columns, rows):
+    writer = csv.writer(_Echo())
+    yield writer.writerow([title for title, _ in columns]).encode('utf-8-sig')
+    batch = []
+    for row in rows.iterator(chunk_size=CHUNK_SIZE):
+        batch.append(writer.writerow(['' if value is None else value for value in row]))
+        if len(batch) >= CHUNK_SIZE:
+            yield ''.join(batch).encode('utf-8')
+            batch = []
+    if batch:
+        yield ''.join(batch).encode('utf-8')
+
+
+XLSX_CONTENT_TYPES = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+    '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+    '<Default Extension="xml" ContentType="application/xml"/>'
+    '<Override PartName="/xl/workbook.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+    '<Override PartName="/xl/worksheets/sheet1.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+    '</Types>'
+)
+XLSX_ROOT_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" '
+    'Target="xl/workbook.xml"/>'
+    '</Relationships>'
+)
+XLSX_WORKBOOK = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+    'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+    '<sheets><sheet name="{name}" sheetId="1" r:id="rId1"/></sheets>'
+    '</workbook>'
+)
+XLSX_WORKBOOK_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" '
+    'Target="worksheets/sheet1.xml"/>'
+    '</Relationships>'
+)
+
+
+def _xlsx_row(values):
+    cells = []
+    for value in values:
+        if value is None or value == '':
+            cells.append('<c/>')
+        elif isinstance(value, (int, float, Decimal)) and not isinstance(value, bool):
+            cells.append(f'<c><v>{value}</v></c>')
+        else:
+            cells.append(f'<c t="inlineStr"><is><t>{escape(str(value))}</t></is></c>')
+    return f'<row>{"".join(cells)}</row>'
+
+
+def stream_xlsx(columns, rows, sheet_name='Export'):
+    buffer = _Buffer()
+    with zipfile.ZipFile(buffer, 'w', compression=zipfile.ZIP_DEFLATED) as package:
+        package.writestr('[Content_Types].xml', XLSX_CONTENT_TYPES)
+        package.writestr('_rels/.rels', XLSX_ROOT_RELS)
+        package.writestr('xl/workbook.xml', XLSX_WORKBOOK.format(name=escape(sheet_name)))
+        package.writestr('xl/_rels/workbook.xml.rels', XLSX_WORKBOOK_RELS)
+        yield buffer.drain()
+
+        with package.open('xl/worksheets/sheet1.xml', 'w', force_zip64=True) as sheet:
+            sheet.write(
+                b'<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+                b'<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main"><sheetData>'
+            )
+            sheet.write(_xlsx_row([title for title, _ in columns]).encode('utf-8'))
+            batch = []
+            for row in rows.iterator(chunk_size=CHUNK_SIZE):
+                batch.append(_xlsx_row(row))
+                if len(batch) >= CHUNK_SIZE:
+                    sheet.write(''.join(batch).encode('utf-8'))
+                    batch = []
+                    yield buffer.drain()
+            if batch:
+                sheet.write(''.join(batch).encode('utf-8'))
+            sheet.write(b'</sheetData></worksheet>')
+    yield buffer.drain()
+
+
+def stream_export(columns, rows, fmt, sheet_name='Export'):
+    if fmt == 'xlsx':
+        return stream_xlsx(columns, rows, sheet_name)
+    return stream_csv(columns, rows)
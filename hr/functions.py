@@ -0,0 +1,22 @@
+from django.db.models import DecimalField, Func
+
+
+class HoursBetween(Func):
+    """Hours from start to end (both TimeField expressions), computed in the database"""
+    arity = 2
+    output_field = DecimalField(max_digits=4, decimal_places=2)
+    template = 'ROUND(CAST(EXTRACT(EPOCH FROM (%(end)s - %(start)s)) / 3600 AS NUMERIC), 2)'
+
+    def as_sql(self, compiler, connection, template=None, **extra_context):
+        start, end = self.get_source_expressions()
+        start_sql, start_params = compiler.compile(start)
+        end_sql, end_params = compiler.compile(end)
+        sql = (template or self.template) % {'start': start_sql, 'end': end_sql}
+        return sql, (*end_params, *start_params)
+
+    def as_sqlite(self, compiler, connection, **extra_context):
+        return self.as_sql(
+            compiler, connection,
+            template='ROUND((julianday(%(end)s) - julianday(%(start)s)) * 24, 2)',
+            **extra_context,
+        )
@@ -0,0 +1,65 @@
+from calendar import monthrange
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import IntegrityError
+from django.utils import timezone
+
+from employee.models import Employee
+from hr.models import LeaveLedgerEntry, leave_accrual_rates
+
+
+class Command(BaseCommand):
+    help = (
+        'Post the monthly leave accrual (settings.LEAVE_ACCRUAL) to the ledger for every '
+        'active employee hired by the end of the month. Employees already accrued for the '
+        'month are skipped, so the command is safe to re-run.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--month', help='Month to accrue (YYYY-MM, default the current month)')
+        parser.add_argument('--batch-size', type=int, default=1000, help='Employees posted per transaction')
+
+    def handle(self, *args, **options):
+        try:
+            year, month = map(int, (options['month'] or timezone.now().strftime('%Y-%m')).split('-'))
+            period = date(year, month, 1)
+        except ValueError:
+            raise CommandError('--month must look like YYYY-MM.')
+        rates = leave_accrual_rates()
+        if not rates:
+            raise CommandError('settings.LEAVE_ACCRUAL has no leave types to accrue.')
+
+        employee_ids = list(Employee.objects.filter(
+            user__is_active=True,
+            hire_date__lte=date(year, month, monthrange(year, month)[1]),
+        ).order_by('id').values_list('id', flat=True))
+        done = set(LeaveLedgerEntry.objects.filter(
+            entry_type='accrual', period=period,
+        ).values_list('employee_id', 'leave_type'))
+
+        entries = [
+            LeaveLedgerEntry(
+                employee_id=employee_id,
+                leave_type=leave_type,
+                entry_type='accrual',
+                days=days,
+                period=period,
+                note=f'Monthly accrual {period:%Y-%m}',
+            )
+            for employee_id in employee_ids
+            for leave_type, days in rates.items()
+            if days and (employee_id, leave_type) not in done
+        ]
+
+        batch = options['batch_size'] * len(rates)
+        try:
+            for offset in range(0, len(entries), batch):
+                LeaveLedgerEntry.objects.post(entries[offset:offset + batch])
+        except IntegrityError:
+            raise CommandError(f'Another accrual for {period:%Y-%m} ran at the same time; run the command again.')
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Posted {len(entries)} accrual entries for {period:%Y-%m} '
+            f'({len(employee_ids)} employees, {len(done)} entries already posted).'
+        ))
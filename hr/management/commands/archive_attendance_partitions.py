@@ -0,0 +1,52 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.utils import timezone
+
+from hr import partitioning
+
+
+class Command(BaseCommand):
+    help = (
+        'Detach hr_attendance partitions older than the retention horizon and move them '
+        'to an archive schema (or drop them). Monthly totals stay available through '
+        'AttendanceSummary.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--keep-months', type=int,
+                            default=getattr(settings, 'ATTENDANCE_RETENTION_MONTHS', 24),
+                            help='Months of attendance to keep attached, counting the current one')
+        parser.add_argument('--archive-schema', default='archive',
+                            help='Schema that receives detached partitions')
+        parser.add_argument('--drop', action='store_true', help='Drop old partitions instead of archiving them')
+        parser.add_argument('--dry-run', action='store_true', help='Only list the partitions that would be detached')
+
+    def handle(self, *args, **options):
+        if not partitioning.partitioning_enabled(connection):
+            raise CommandError('Attendance partitioning needs PostgreSQL and ATTENDANCE_PARTITIONING = True.')
+        if options['keep_months'] < 1:
+            raise CommandError('--keep-months must be at least 1.')
+
+        horizon = partitioning.add_months(timezone.now().date(), 1 - options['keep_months'])
+        archive_schema = None if options['drop'] else options['archive_schema']
+
+        with transaction.atomic(), connection.cursor() as cursor:
+            if not partitioning.is_partitioned(cursor):
+                raise CommandError('hr_attendance is not partitioned; run create_attendance_partitions --convert.')
+
+            expired = sorted(
+                (first_day, name) for first_day, name in partitioning.month_partitions(cursor).items()
+                if first_day < horizon
+            )
+            for first_day, name in expired:
+                if options['dry_run']:
+                    self.stdout.write(f'Would detach {name}')
+                    continue
+                partitioning.detach_month_partition(cursor, name, archive_schema)
+                action = 'Dropped' if archive_schema is None else f'Moved to {archive_schema}:'
+                self.stdout.write(f'{action} {name}')
+
+        self.stdout.write(self.style.SUCCESS(
+            f'{len(expired)} partitions before {horizon:%Y-%m} {"found" if options["dry_run"] else "detached"}.'
+        ))
@@ -0,0 +1,37 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.utils import timezone
+
+from hr import partitioning
+
+
+class Command(BaseCommand):
+    help = (
+        'Create monthly hr_attendance partitions ahead of time (PostgreSQL with '
+        'ATTENDANCE_PARTITIONING on). Run it from cron, e.g. once a week.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--months-ahead', type=int, default=3,
+                            help='Create partitions up to this many months after the current one')
+        parser.add_argument('--convert', action='store_true',
+                            help='Partition an existing unpartitioned hr_attendance table first')
+
+    def handle(self, *args, **options):
+        if not partitioning.partitioning_enabled(connection):
+            raise CommandError('Attendance partitioning needs PostgreSQL and ATTENDANCE_PARTITIONING = True.')
+
+        with transaction.atomic(), connection.cursor() as cursor:
+            if not partitioning.is_partitioned(cursor):
+                if not options['convert']:
+                    raise CommandError('hr_attendance is not partitioned yet; rerun with --convert.')
+                partitioning.convert_to_partitioned(cursor, options['months_ahead'])
+                self.stdout.write('Converted hr_attendance to a monthly partitioned table.')
+
+            today = timezone.now().date()
+            through = partitioning.add_months(today, options['months_ahead'])
+            created = partitioning.ensure_partitions(cursor, today, through)
+
+        for name in created:
+            self.stdout.write(f'Created partition {name}')
+        self.stdout.write(self.style.SUCCESS(f'{len(created)} partitions created through {through:%Y-%m}.'))
@@ -0,0 +1,47 @@
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+
+from hr.notifications import dispatch
+
+
+class Command(BaseCommand):
+    help = (
+        'Email queued notifications from the outbox: one digest per recipient per batch, '
+        'all over one connection, with failed sends retried after an exponential backoff. '
+        'Drains the queue and exits, or keeps polling with --loop.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=200, help='Events claimed per batch')
+        parser.add_argument('--max-attempts', type=int, default=5, help='Give up on an event after this many failed sends')
+        parser.add_argument('--backoff', type=int, default=60,
+                            help='Seconds before the first retry; doubles with every further attempt')
+        parser.add_argument('--loop', type=int, metavar='SECONDS',
+                            help='Keep running, polling the outbox this often once it is empty')
+
+    def handle(self, *args, **options):
+        if options['batch_size'] < 1 or options['max_attempts'] < 1:
+            raise CommandError('--batch-size and --max-attempts must be positive.')
+        backoff = timedelta(seconds=options['backoff'])
+
+        while True:
+            totals = [0, 0, 0, 0]
+            while True:
+                result = dispatch(options['batch_size'], options['max_attempts'], backoff)
+                totals = [total + count for total, count in zip(totals, result)]
+                # A short batch means nothing else is due right now
+                if sum(result[1:]) < options['batch_size']:
+                    break
+
+            emails, sent, retried, failed = totals
+            if sent or retried or failed:
+                self.stdout.write(self.style.SUCCESS(
+                    f'Sent {emails} emails covering {sent} events; {retried} to retry, {failed} given up.'
+                ))
+            if not options['loop']:
+                if not (sent or retried or failed):
+                    self.stdout.write('No notifications due.')
+                return
+            time.sleep(options['loop'])
@@ -0,0 +1,150 @@
+import json
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import URLPattern, reverse
+
+from accounts import urls as accounts_urls
+from employee import urls as employee_urls
+from employee.models import Employee
+from hr import urls as hr_urls
+
+URL_MODULES = [hr_urls, employee_urls, accounts_urls]
+
+# Pages that only read on GET. Anything else (approve_leave, logout, the CSV
+# exports) is never requested: the rollback undoes database writes but not
+# cache version bumps, emails or minutes of export work.
+READ_ONLY_URLS = {
+    'leave_requests', 'team_calendar', 'team_calendar_data', 'performance_reviews',
+    'attendance_records', 'attendance_calendar', 'employee_attendance', 'mark_attendance',
+    'submit_leave_request',
+    'employee_list', 'employee_search', 'employee_detail', 'department_list',
+    'department_analytics', 'department_analytics_data',
+    'dashboard', 'employee_profile',
+}
+
+# Models that supply a real primary key for URLs with a <pk> argument
+PK_MODELS = {
+    'employee_detail': Employee,
+}
+
+
+class Command(BaseCommand):
+    help = (
+        'Request every read-only page in the hr, employee and accounts URLconfs, run '
+        'EXPLAIN on each SELECT the page issued and flag sequential scans on large '
+        'tables. Everything runs inside a transaction that is rolled back.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--username', help='User to request the pages as (default: first HR/staff user)')
+        parser.add_argument('--min-rows', type=int, default=10000,
+                            help='Only flag scans on tables with at least this many rows')
+
+    def handle(self, *args, **options):
+        if connection.vendor not in ('sqlite', 'postgresql'):
+            raise CommandError(f'EXPLAIN parsing is not implemented for {connection.vendor}.')
+
+        User = get_user_model()
+        if options['username']:
+            user = User.objects.filter(username=options['username']).first()
+        else:
+            user = User.objects.filter(role='hr').first() or User.objects.filter(is_staff=True).first()
+        if user is None:
+            raise CommandError('No user to request the pages as; pass --username.')
+
+        host = next((host.lstrip('.') for host in settings.ALLOWED_HOSTS if host != '*'), 'localhost')
+        self.min_rows = options['min_rows']
+        self.table_sizes = {}
+        flagged = 0
+
+        with transaction.atomic():
+            for name, url in self.urls():
+                client = Client(HTTP_HOST=host)
+                client.force_login(user)
+                with CaptureQueriesContext(connection) as captured:
+                    try:
+                        with transaction.atomic():
+                            response = client.get(url)
+                        status = response.status_code
+                    except Exception as e:
+                        status = type(e).__name__
+
+                self.stdout.write(f'{url} ({name}): {status}, {len(captured.captured_queries)} queries')
+                seen = set()
+                for query in captured.captured_queries:
+                    sql = query['sql']
+                    if not sql.lstrip().upper().startswith('SELECT') or sql in seen:
+                        continue
+                    seen.add(sql)
+                    for table in self.sequential_scans(sql):
+                        rows = self.table_size(table)
+                        if rows >= self.min_rows:
+                            flagged += 1
+                            self.stdout.write(self.style.WARNING(
+                                f'  Sequential scan on {table} ({rows} rows): {sql[:200]}'
+                            ))
+            transaction.set_rollback(True)
+
+        if flagged:
+            self.stdout.write(self.style.WARNING(f'{flagged} sequential scans on large tables.'))
+        else:
+            self.stdout.write(self.style.SUCCESS('No sequential scans on large tables.'))
+
+    def urls(self):
+        seen = set()
+        for module in URL_MODULES:
+            for pattern in module.urlpatterns:
+                if not isinstance(pattern, URLPattern) or pattern.name not in READ_ONLY_URLS:
+                    continue
+                kwargs = {}
+                if 'pk' in pattern.pattern.converters:
+                    model = PK_MODELS.get(pattern.name)
+                    pk = model.objects.values_list('pk', flat=True).first() if model else None
+                    if pk is None:
+                        continue
+                    kwargs['pk'] = pk
+                url = reverse(pattern.name, kwargs=kwargs)
+                if url not in seen:
+                    seen.add(url)
+                    yield pattern.name, url
+
+    def sequential_scans(self, sql):
+        """Table names the database plans to read without an index"""
+        with connection.cursor() as cursor:
+            if connection.vendor == 'postgresql':
+                cursor.execute(f'EXPLAIN (FORMAT JSON) {sql}')
+                plan = cursor.fetchone()[0]
+                if isinstance(plan, str):
+                    plan = json.loads(plan)
+                return list(self._pg_seq_scans(plan[0]['Plan']))
+
+            cursor.execute(f'EXPLAIN QUERY PLAN {sql}')
+            tables = []
+            for row in cursor.fetchall():
+                detail = row[-1].split()
+                # "SCAN table" is a full scan; "SCAN table USING ... INDEX" walks an index
+                if len(detail) >= 2 and detail[0] == 'SCAN' and 'USING' not in detail:
+                    tables.append(detail[1])
+            return tables
+
+    def _pg_seq_scans(self, node):
+        if node.get('Node Type') == 'Seq Scan':
+            yield node['Relation Name']
+        for child in node.get('Plans', []):
+            yield from self._pg_seq_scans(child)
+
+    def table_size(self, table):
+        if table not in self.table_sizes:
+            try:
+                with transaction.atomic(), connection.cursor() as cursor:
+                    cursor.execute(f'SELECT COUNT(*) FROM {connection.ops.quote_name(table)}')
+                    self.table_sizes[table] = cursor.fetchone()[0]
+            except Exception:
+                # Aliases in the plan that aren't real tables
+                self.table_sizes[table] = 0
+        return self.table_sizes[table]
@@ -0,0 +1,54 @@
+import sys
+import time
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+
+from hr.exports import attendance_rows, leave_rows, stream_export
+
+DATASETS = {
+    'attendance': attendance_rows,
+    'leave': leave_rows,
+}
+
+
+class Command(BaseCommand):
+    help = 'Stream attendance or leave requests to a CSV or XLSX file with constant memory use'
+
+    def add_arguments(self, parser):
+        parser.add_argument('dataset', choices=sorted(DATASETS))
+        parser.add_argument('output', help='File to write, or "-" for stdout')
+        parser.add_argument('--format', choices=['csv', 'xlsx'], help='Output format (default: from the file extension)')
+        parser.add_argument('--start', help='First date (YYYY-MM-DD)')
+        parser.add_argument('--end', help='Last date (YYYY-MM-DD)')
+        parser.add_argument('--department', type=int, help='Department pk')
+        parser.add_argument('--status', help='Only rows with this status')
+
+    def handle(self, *args, **options):
+        output = options['output']
+        fmt = options['format'] or ('xlsx' if output.endswith('.xlsx') else 'csv')
+        try:
+            start = date.fromisoformat(options['start']) if options['start'] else None
+            end = date.fromisoformat(options['end']) if options['end'] else None
+        except ValueError:
+            raise CommandError('Dates must look like YYYY-MM-DD.')
+
+        columns, rows = DATASETS[options['dataset']](
+            start=start, end=end, department=options['department'], status=options['status'],
+        )
+
+        started = time.monotonic()
+        written = 0
+        stream = sys.stdout.buffer if output == '-' else open(output, 'wb')
+        try:
+            for chunk in stream_export(columns, rows, fmt, sheet_name=options['dataset'].title()):
+                stream.write(chunk)
+                written += len(chunk)
+        finally:
+            if stream is not sys.stdout.buffer:
+                stream.close()
+
+        if output != '-':
+            self.stdout.write(self.style.SUCCESS(
+                f'Wrote {written:,} bytes to {output} in {time.monotonic() - started:.1f}s.'
+            ))
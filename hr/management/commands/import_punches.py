@@ -0,0 +1,204 @@
+import csv
+import json
+import sys
+import time
+from datetime import datetime
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+
+from employee.models import Employee
+from hr.models import Attendance, AttendanceSummary
+
+IN_DIRECTIONS = {'in', 'check_in', 'entry', '0'}
+OUT_DIRECTIONS = {'out', 'check_out', 'exit', '1'}
+
+
+class Command(BaseCommand):
+    help = (
+        'Stream a CSV or JSONL file of biometric/turnstile punches into Attendance. '
+        'Punches are paired per employee and day (first check-in, last check-out) and '
+        'upserted in batches. The file is expected in chronological order; a day is '
+        'written as soon as a later day shows up, so memory stays flat. A late punch for a '
+        'day already written is merged into it (earliest check-in, latest check-out).'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='Punch file to import, or "-" for stdin')
+        parser.add_argument('--format', choices=['csv', 'jsonl'], help='Input format (default: from the file extension)')
+        parser.add_argument('--batch-size', type=int, default=2000, help='Attendance rows per upsert')
+        parser.add_argument('--employee-field', default='employee_id', help='Field holding Employee.employee_id')
+        parser.add_argument('--time-field', default='timestamp', help='Field holding the ISO 8601 punch time')
+        parser.add_argument('--direction-field', default='direction',
+                            help='Field holding in/out; without it the first punch of a day is the check-in')
+
+    def handle(self, *args, **options):
+        path = options['path']
+        fmt = options['format'] or ('jsonl' if path.endswith(('.jsonl', '.ndjson')) else 'csv')
+        self.batch_size = options['batch_size']
+        self.employee_field = options['employee_field']
+        self.time_field = options['time_field']
+        self.direction_field = options['direction_field']
+        self.verbosity = options['verbosity']
+
+        self.employee_pks = dict(Employee.objects.values_list('employee_id', 'id'))
+        self.open_days = {}  # (employee pk, date) -> [first check-in, last check-out, first punch, last punch]
+        self.pending = []
+        self.stats = {'punches': 0, 'rows': 0, 'unknown': 0, 'invalid': 0}
+
+        started = time.monotonic()
+        stream = sys.stdin if path == '-' else open(path, newline='', encoding='utf-8')
+        try:
+            records = self.read_jsonl(stream) if fmt == 'jsonl' else csv.DictReader(stream)
+            current_date = None
+            for record in records:
+                punch = self.parse(record)
+                if punch is None:
+                    continue
+                employee_pk, punched_at, direction = punch
+                # A later day means every earlier day is complete
+                if current_date is not None and punched_at.date() > current_date:
+                    self.close_days_before(punched_at.date())
+                current_date = max(current_date or punched_at.date(), punched_at.date())
+                self.add_punch(employee_pk, punched_at, direction)
+            self.close_days_before(None)
+            self.flush()
+        finally:
+            if stream is not sys.stdin:
+                stream.close()
+
+        elapsed = max(time.monotonic() - started, 1e-9)
+        self.stdout.write(self.style.SUCCESS(
+            f"Imported {self.stats['punches']} punches into {self.stats['rows']} attendance rows "
+            f"in {elapsed:.1f}s ({self.stats['punches'] / elapsed:,.0f} punches/s, "
+            f"{self.stats['rows'] / elapsed:,.0f} rows/s)."
+        ))
+        if self.stats['unknown'] or self.stats['invalid']:
+            self.stdout.write(self.style.WARNING(
+                f"Skipped {self.stats['unknown']} punches for unknown employees "
+                f"and {self.stats['invalid']} malformed punches."
+            ))
+
+    def read_jsonl(self, stream):
+        for line_number, line in enumerate(stream, 1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError as e:
+                raise CommandError(f'Line {line_number}: invalid JSON ({e})')
+
+    def parse(self, record):
+        """Turn a raw record into (employee pk, local punch datetime, direction)"""
+        employee_pk = self.employee_pks.get(str(record.get(self.employee_field, '')).strip())
+        if employee_pk is None:
+            self.stats['unknown'] += 1
+            return None
+
+        try:
+            punched_at = datetime.fromisoformat(str(record[self.time_field]).strip())
+        except (KeyError, ValueError):
+            self.stats['invalid'] += 1
+            return None
+        if timezone.is_aware(punched_at):
+            punched_at = timezone.localtime(punched_at)
+
+        direction = str(record.get(self.direction_field) or '').strip().lower()
+        if direction in IN_DIRECTIONS:
+            direction = 'in'
+        elif direction in OUT_DIRECTIONS:
+            direction = 'out'
+        else:
+            direction = None
+
+        self.stats['punches'] += 1
+        return employee_pk, punched_at.replace(tzinfo=None), direction
+
+    def add_punch(self, employee_pk, punched_at, direction):
+        key = (employee_pk, punched_at.date())
+        day = self.open_days.get(key)
+        if day is None:
+            day = self.open_days[key] = [None, None, punched_at, punched_at]
+        else:
+            day[2] = min(day[2], punched_at)
+            day[3] = max(day[3], punched_at)
+        if direction == 'in' and (day[0] is None or punched_at < day[0]):
+            day[0] = punched_at
+        elif direction == 'out' and (day[1] is None or punched_at > day[1]):
+            day[1] = punched_at
+
+    def close_days_before(self, cutoff):
+        """Queue every buffered day earlier than cutoff (all days when None) for writing"""
+        for key in [key for key in self.open_days if cutoff is None or key[1] < cutoff]:
+            self.pending.append((key, self.open_days.pop(key)))
+            if len(self.pending) >= self.batch_size:
+                self.flush()
+
+    def merge_day(self, day, other):
+        """Combine two [first check-in, last check-out, first punch, last punch] lists"""
+        first_in = min((punch for punch in (day[0], other[0]) if punch is not None), default=None)
+        last_out = max((punch for punch in (day[1], other[1]) if punch is not None), default=None)
+        return [first_in, last_out, min(day[2], other[2]), max(day[3], other[3])]
+
+    def attendance_row(self, key, day):
+        employee_pk, day_date = key
+        first_in, last_out, first_punch, last_punch = day
+        if first_in is None and last_out is None:
+            # No direction information: first and last punch of the day
+            check_in, check_out = first_punch, last_punch
+        else:
+            check_in, check_out = first_in or first_punch, last_out
+        if check_out is not None and check_out <= check_in:
+            check_out = None
+
+        working_hours = None
+        if check_out is not None:
+            hours = (check_out - check_in).total_seconds() / 3600
+            working_hours = Decimal(str(round(hours, 2)))
+
+        return Attendance(
+            employee_id=employee_pk,
+            date=day_date,
+            status='present',
+            check_in_time=check_in.time(),
+            check_out_time=check_out.time() if check_out else None,
+            working_hours=working_hours,
+        )
+
+    def flush(self):
+        if not self.pending:
+            return
+        # Out-of-order punches can reopen a day closed earlier in this batch or already
+        # stored. Merge rather than overwrite, or the late fragment would replace the day.
+        days = {}
+        for key, day in self.pending:
+            days[key] = self.merge_day(days[key], day) if key in days else day
+        with transaction.atomic():
+            stored = Attendance.objects.select_for_update().filter(
+                employee_id__in={employee_pk for employee_pk, _ in days},
+                date__range=(min(day_date for _, day_date in days), max(day_date for _, day_date in days)),
+                check_in_time__isnull=False,
+            ).values_list('employee_id', 'date', 'check_in_time', 'check_out_time')
+            for employee_pk, day_date, check_in_time, check_out_time in stored:
+                key = (employee_pk, day_date)
+                if key in days:
+                    check_in = datetime.combine(day_date, check_in_time)
+                    check_out = datetime.combine(day_date, check_out_time) if check_out_time else None
+                    days[key] = self.merge_day(days[key], [check_in, check_out, check_in, check_out or check_in])
+            rows = [self.attendance_row(key, day) for key, day in days.items()]
+            Attendance.objects.bulk_create(
+                rows,
+                update_conflicts=True,
+                unique_fields=['employee', 'date'],
+                update_fields=['status', 'check_in_time', 'check_out_time', 'working_hours'],
+            )
+            AttendanceSummary.objects.refresh(
+                (row.employee_id, row.date.year, row.date.month) for row in rows
+            )
+        self.stats['rows'] += len(rows)
+        if self.verbosity > 1:
+            self.stdout.write(f"  {self.stats['rows']} attendance rows written")
+        self.pending = []
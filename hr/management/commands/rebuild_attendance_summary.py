@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+from hr.models import AttendanceSummary
+
+
+class Command(BaseCommand):
+    help = (
+        'Rebuild the monthly attendance rollup from the raw Attendance table. Months before '
+        'the earliest raw row (archived partitions) keep their summaries.'
+    )
+
+    def handle(self, *args, **options):
+        created = AttendanceSummary.objects.rebuild()
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt {created} monthly attendance summaries.'))
@@ -0,0 +1,63 @@
+from datetime import date, time, timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from hr.models import Attendance
+
+
+class Command(BaseCommand):
+    help = (
+        'End-of-day attendance reconciliation: add absent rows for active employees who '
+        'never checked in on a working day, and check out rows left open at the cutoff. '
+        'Safe to re-run and to run for back-dated ranges; absence emails go out for the '
+        'latest complete working day only.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--start', help='First day to reconcile (YYYY-MM-DD, default today)')
+        parser.add_argument('--end', help='Last day to reconcile (YYYY-MM-DD, default --start)')
+        parser.add_argument('--cutoff', default=getattr(settings, 'ATTENDANCE_AUTO_CLOSE_TIME', '20:00'),
+                            help='Check-out time given to rows left open (HH:MM, server time zone)')
+        parser.add_argument('--skip-absent', action='store_true', help='Do not add absent rows')
+        parser.add_argument('--skip-close', action='store_true', help='Do not close open rows')
+
+    def handle(self, *args, **options):
+        now = timezone.now()
+        try:
+            start = date.fromisoformat(options['start']) if options['start'] else now.date()
+            end = date.fromisoformat(options['end']) if options['end'] else start
+            cutoff = time.fromisoformat(options['cutoff'])
+        except ValueError:
+            raise CommandError('Dates must look like YYYY-MM-DD and --cutoff like HH:MM.')
+        if end < start:
+            raise CommandError('End date cannot be before start date.')
+
+        # Today is only complete once its cutoff has passed
+        last_complete = now.date() if now.time() >= cutoff else now.date() - timedelta(days=1)
+        end = min(end, last_complete)
+        if end < start:
+            self.stdout.write(self.style.WARNING('Nothing to reconcile before the cutoff has passed.'))
+            return
+
+        working_days = set(getattr(settings, 'ATTENDANCE_WORKING_DAYS', range(5)))
+        # Only the latest complete working day is worth an email; older days are back-fills
+        notify_day = last_complete
+        while notify_day.weekday() not in working_days and notify_day > start:
+            notify_day -= timedelta(days=1)
+        absent = 0
+        if not options['skip_absent']:
+            day = start
+            while day <= end:
+                if day.weekday() in working_days:
+                    absent += Attendance.objects.mark_absent(day, notify=day == notify_day)
+                day += timedelta(days=1)
+
+        closed = 0
+        if not options['skip_close']:
+            closed = Attendance.objects.close_open(start, end, cutoff)
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Reconciled {start} to {end}: {absent} absent rows added, {closed} open rows closed at {cutoff:%H:%M}.'
+        ))
@@ -0,0 +1,69 @@
+# Generated by Django 5.1 on 2026-10-18 11:06
+
+from decimal import Decimal
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count, DecimalField, Q, Sum, Value
+from django.db.models.functions import Coalesce, ExtractMonth, ExtractYear
+
+BATCH_SIZE = 500
+
+
+def fill_summaries(apps, schema_editor):
+    # Same aggregates as AttendanceSummaryManager.rebuild, frozen here
+    Attendance = apps.get_model('hr', 'Attendance')
+    AttendanceSummary = apps.get_model('hr', 'AttendanceSummary')
+    totals = Attendance.objects.order_by().annotate(
+        year=ExtractYear('date'),
+        month=ExtractMonth('date'),
+    ).values('employee', 'year', 'month').annotate(
+        present_count=Count('id', filter=Q(status='present')),
+        absent_count=Count('id', filter=Q(status='absent')),
+        late_count=Count('id', filter=Q(status='late')),
+        half_day_count=Count('id', filter=Q(status='half_day')),
+        total_count=Count('id'),
+        working_hours=Coalesce(
+            Sum('working_hours'), Value(Decimal('0')),
+            output_field=DecimalField(max_digits=7, decimal_places=2),
+        ),
+    )
+    batch = []
+    for row in totals.iterator(chunk_size=BATCH_SIZE):
+        batch.append(AttendanceSummary(employee_id=row.pop('employee'), **row))
+        if len(batch) >= BATCH_SIZE:
+            AttendanceSummary.objects.bulk_create(batch)
+            batch = []
+    AttendanceSummary.objects.bulk_create(batch)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('employee', '0001_initial'),
+        ('hr', '0002_attendance'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AttendanceSummary',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('year', models.PositiveSmallIntegerField()),
+                ('month', models.PositiveSmallIntegerField()),
+                ('present_count', models.PositiveIntegerField(default=0)),
+                ('absent_count', models.PositiveIntegerField(default=0)),
+                ('late_count', models.PositiveIntegerField(default=0)),
+                ('half_day_count', models.PositiveIntegerField(default=0)),
+                ('total_count', models.PositiveIntegerField(default=0)),
+                ('working_hours', models.DecimalField(decimal_places=2, default=0, max_digits=7)),
+                ('employee', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='attendance_summaries', to='employee.employee')),
+            ],
+            options={
+                'ordering': ['-year', '-month'],
+                'unique_together': {('employee', 'year', 'month')},
+            },
+        ),
+        # Existing attendance would otherwise show as zero until rebuild_attendance_summary is run
+        migrations.RunPython(fill_summaries, migrations.RunPython.noop),
+    ]
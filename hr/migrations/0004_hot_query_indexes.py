@@ -0,0 +1,32 @@
+# Generated by Django 5.1 on 2026-10-18 11:10
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('employee', '0002_employee_hire_date_idx'),
+        ('hr', '0003_attendancesummary'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='attendance',
+            index=models.Index(fields=['date', 'status'], name='hr_attendance_date_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='leaverequest',
+            index=models.Index(fields=['status', '-created_at'], name='hr_leave_status_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='leaverequest',
+            index=models.Index(fields=['employee', 'status', '-created_at'], name='hr_leave_emp_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='leaverequest',
+            index=models.Index(condition=models.Q(('status', 'pending')), fields=['-created_at'], name='hr_leave_pending_idx'),
+        ),
+    ]
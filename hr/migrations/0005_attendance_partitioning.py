@@ -0,0 +1,27 @@
+from django.db import migrations
+
+from hr import partitioning
+
+
+def unpartition_attendance(apps, schema_editor):
+    connection = schema_editor.connection
+    if connection.vendor != 'postgresql':
+        return
+    with connection.cursor() as cursor:
+        if partitioning.is_partitioned(cursor):
+            partitioning.convert_to_plain(cursor)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hr', '0004_hot_query_indexes'),
+    ]
+
+    # Partitioning is opt-in (ATTENDANCE_PARTITIONING, then
+    # create_attendance_partitions --convert), so going forwards changes nothing
+    # whatever the settings say. Going backwards turns a partitioned table back
+    # into a plain one, so 0004's schema is what it expects.
+    operations = [
+        migrations.RunPython(migrations.RunPython.noop, unpartition_attendance),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.1 on 2026-10-18 11:15
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hr', '0005_attendance_partitioning'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='attendance',
+            name='overtime_hours',
+            field=models.DecimalField(blank=True, decimal_places=2, max_digits=4, null=True),
+        ),
+    ]
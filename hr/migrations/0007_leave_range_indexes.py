@@ -0,0 +1,75 @@
+# Generated by Django 5.1 on 2026-10-18 11:18
+
+from django.conf import settings
+from django.db import migrations, models
+
+MAX_LISTED_OVERLAPS = 20  # Conflicting pairs named in the error
+
+
+def check_no_overlaps(schema_editor):
+    """Stop with the conflicting request ids if existing rows would violate hr_leave_no_overlap"""
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT a.employee_id, a.id, b.id FROM hr_leaverequest a "
+            "JOIN hr_leaverequest b ON b.employee_id = a.employee_id AND b.id > a.id "
+            "AND b.start_date <= a.end_date AND a.start_date <= b.end_date "
+            "WHERE a.status IN ('pending', 'approved') AND b.status IN ('pending', 'approved') "
+            "ORDER BY a.employee_id, a.id, b.id LIMIT %s",
+            [MAX_LISTED_OVERLAPS + 1],
+        )
+        overlaps = cursor.fetchall()
+    if overlaps:
+        listed = ', '.join(f'#{first} and #{second} (employee {employee_id})'
+                           for employee_id, first, second in overlaps[:MAX_LISTED_OVERLAPS])
+        more = ' and more' if len(overlaps) > MAX_LISTED_OVERLAPS else ''
+        raise RuntimeError(
+            f'Pending or approved leave requests overlap: {listed}{more}. Reject or shorten one '
+            f'request of each pair, then run the migration again.'
+        )
+
+
+def add_leave_range_constraint(apps, schema_editor):
+    # A daterange GiST index and an exclusion constraint that stops overlapping
+    # pending/approved requests for the same employee, PostgreSQL only
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    # Checked first so the failure names the rows instead of a bare constraint error
+    check_no_overlaps(schema_editor)
+    schema_editor.execute('CREATE EXTENSION IF NOT EXISTS btree_gist')
+    schema_editor.execute(
+        "CREATE INDEX hr_leave_range_gist ON hr_leaverequest "
+        "USING gist (daterange(start_date, end_date, '[]'))"
+    )
+    schema_editor.execute(
+        "ALTER TABLE hr_leaverequest ADD CONSTRAINT hr_leave_no_overlap "
+        "EXCLUDE USING gist (employee_id WITH =, daterange(start_date, end_date, '[]') WITH &&) "
+        "WHERE (status IN ('pending', 'approved'))"
+    )
+
+
+def remove_leave_range_constraint(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute('ALTER TABLE hr_leaverequest DROP CONSTRAINT IF EXISTS hr_leave_no_overlap')
+    schema_editor.execute('DROP INDEX IF EXISTS hr_leave_range_gist')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('employee', '0004_department_max_on_leave'),
+        ('hr', '0006_attendance_overtime_hours'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='leaverequest',
+            index=models.Index(fields=['employee', 'end_date'], name='hr_leave_emp_end_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='leaverequest',
+            index=models.Index(fields=['status', 'end_date'], name='hr_leave_status_end_idx'),
+        ),
+        migrations.RunPython(add_leave_range_constraint, remove_leave_range_constraint),
+    ]
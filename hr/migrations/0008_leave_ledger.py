@@ -0,0 +1,50 @@
+# Generated by Django 5.1 on 2026-10-18 11:19
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('employee', '0004_department_max_on_leave'),
+        ('hr', '0007_leave_range_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LeaveBalance',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('leave_type', models.CharField(choices=[('annual', 'Annual Leave'), ('sick', 'Sick Leave'), ('personal', 'Personal Leave'), ('maternity', 'Maternity Leave')], max_length=20)),
+                ('balance', models.DecimalField(decimal_places=2, default=0, max_digits=7)),
+                ('employee', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='leave_balances', to='employee.employee')),
+            ],
+            options={
+                'ordering': ['leave_type'],
+                'unique_together': {('employee', 'leave_type')},
+            },
+        ),
+        migrations.CreateModel(
+            name='LeaveLedgerEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('leave_type', models.CharField(choices=[('annual', 'Annual Leave'), ('sick', 'Sick Leave'), ('personal', 'Personal Leave'), ('maternity', 'Maternity Leave')], max_length=20)),
+                ('entry_type', models.CharField(choices=[('accrual', 'Accrual'), ('consumption', 'Consumption'), ('adjustment', 'Adjustment')], max_length=20)),
+                ('days', models.DecimalField(decimal_places=2, max_digits=6)),
+                ('period', models.DateField(blank=True, help_text='First day of the month an accrual is for', null=True)),
+                ('note', models.CharField(blank=True, max_length=255)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('created_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to=settings.AUTH_USER_MODEL)),
+                ('employee', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='leave_ledger', to='employee.employee')),
+                ('leave_request', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='ledger_entries', to='hr.leaverequest')),
+            ],
+            options={
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(fields=['employee', 'leave_type', '-created_at'], name='hr_ledger_emp_type_idx')],
+                'constraints': [models.UniqueConstraint(condition=models.Q(('entry_type', 'accrual')), fields=('employee', 'leave_type', 'period'), name='hr_ledger_one_accrual_per_period')],
+            },
+        ),
+    ]
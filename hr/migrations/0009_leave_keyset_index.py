@@ -0,0 +1,20 @@
+# Generated by Django 5.1 on 2026-10-18 11:24
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('employee', '0004_department_max_on_leave'),
+        ('hr', '0008_leave_ledger'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='leaverequest',
+            index=models.Index(fields=['-created_at', '-id'], name='hr_leave_created_id_idx'),
+        ),
+    ]
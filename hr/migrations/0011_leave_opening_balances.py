@@ -0,0 +1,71 @@
+# Generated by Django 5.1 on 2026-10-18 12:00
+
+from decimal import Decimal
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import F
+
+# Frozen copy of the LEAVE_OPENING_BALANCE default, so the migration does the
+# same thing whatever the settings say when it runs
+OPENING_BALANCE = {'annual': Decimal('18'), 'sick': Decimal('12'), 'personal': Decimal('6')}
+BATCH_SIZE = 1000
+
+
+def seed_opening_balances(apps, schema_editor):
+    Employee = apps.get_model('employee', 'Employee')
+    LeaveLedgerEntry = apps.get_model('hr', 'LeaveLedgerEntry')
+    LeaveBalance = apps.get_model('hr', 'LeaveBalance')
+    employee_ids = list(Employee.objects.order_by('id').values_list('id', flat=True))
+    for offset in range(0, len(employee_ids), BATCH_SIZE):
+        batch = employee_ids[offset:offset + BATCH_SIZE]
+        LeaveLedgerEntry.objects.bulk_create([
+            LeaveLedgerEntry(
+                employee_id=employee_id, leave_type=leave_type, entry_type='opening',
+                days=days, note='Opening balance',
+            )
+            for employee_id in batch
+            for leave_type, days in OPENING_BALANCE.items()
+        ])
+        LeaveBalance.objects.bulk_create(
+            [
+                LeaveBalance(employee_id=employee_id, leave_type=leave_type)
+                for employee_id in batch
+                for leave_type in OPENING_BALANCE
+            ],
+            ignore_conflicts=True,
+        )
+        for leave_type, days in OPENING_BALANCE.items():
+            LeaveBalance.objects.filter(employee_id__in=batch, leave_type=leave_type).update(balance=F('balance') + days)
+
+
+def remove_opening_balances(apps, schema_editor):
+    LeaveLedgerEntry = apps.get_model('hr', 'LeaveLedgerEntry')
+    LeaveBalance = apps.get_model('hr', 'LeaveBalance')
+    openings = LeaveLedgerEntry.objects.filter(entry_type='opening')
+    for leave_type, days in openings.values_list('leave_type', 'days').distinct():
+        employee_ids = openings.filter(leave_type=leave_type, days=days).values('employee_id')
+        LeaveBalance.objects.filter(employee_id__in=employee_ids, leave_type=leave_type).update(balance=F('balance') - days)
+    openings.delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('employee', '0007_reporting_hierarchy'),
+        ('hr', '0010_notification_outbox'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='leaveledgerentry',
+            name='entry_type',
+            field=models.CharField(choices=[('opening', 'Opening Balance'), ('accrual', 'Accrual'), ('consumption', 'Consumption'), ('adjustment', 'Adjustment')], max_length=20),
+        ),
+        migrations.AddConstraint(
+            model_name='leaveledgerentry',
+            constraint=models.UniqueConstraint(condition=models.Q(('entry_type', 'opening')), fields=('employee', 'leave_type'), name='hr_ledger_one_opening_balance'),
+        ),
+        migrations.RunPython(seed_opening_balances, remove_opening_balances),
+    ]
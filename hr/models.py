@@ -1,9 +1,175 @@
-from django.db import models
+from django.conf import settings
+from django.db import connection, models, transaction, IntegrityError
+from django.db.models import Count, F, Min, Q, Sum, Value, DecimalField
+from django.db.models.functions import Coalesce, ExtractMonth, ExtractYear
 from django.contrib.auth import get_user_model
-from employee.models import Employee
+from django.dispatch import Signal
+from django.utils import timezone
+from calendar import monthrange
+from collections import defaultdict
+from datetime import date, timedelta
+from decimal import Decimal
+from employee.models import Department, Employee
+from .calendar_strip import invalidate_months
+from .functions import HoursBetween
 
 User = get_user_model()
 
+# Sent inside the deciding transaction, once per batch of leave requests whose
+# status changed, with changes=[(leave request, previous status), ...] and user
+leave_status_changed = Signal()
+
+class LeaveRequestManager(models.Manager):
+    def overlapping(self, employee, start, end):
+        """The employee's pending or approved requests that share a day with [start, end]"""
+        return self.filter(
+            employee=employee,
+            status__in=['pending', 'approved'],
+            start_date__lte=end,
+            end_date__gte=start,
+        )
+
+    def pending_days(self, employee, leave_type):
+        """Days the employee has requested of leave_type that are still awaiting a decision"""
+        return sum(
+            (end - start).days + 1
+            for start, end in self.filter(
+                employee=employee, leave_type=leave_type, status='pending',
+            ).values_list('start_date', 'end_date')
+        )
+
+    def peak_on_leave(self, department_id, start, end):
+        """Most employees of a department on approved leave on any single day of [start, end]"""
+        intervals = self.filter(
+            employee__department_id=department_id,
+            status='approved',
+            end_date__gte=start,
+            start_date__lte=end,
+        ).values_list('start_date', 'end_date')
+
+        # Difference array over the window, then one running-sum sweep
+        days = (end - start).days + 1
+        changes = [0] * (days + 1)
+        for leave_start, leave_end in intervals:
+            changes[max((leave_start - start).days, 0)] += 1
+            changes[min((leave_end - start).days, days - 1) + 1] -= 1
+
+        peak = running = 0
+        for change in changes[:-1]:
+            running += change
+            peak = max(peak, running)
+        return peak
+
+    def lock_departments(self, department_ids):
+        """
+        Lock department rows, in id order, until the transaction ends, so capacity
+        checks and the approvals they allow happen one at a time per department.
+        """
+        list(Department.objects.select_for_update().filter(id__in=department_ids).order_by('id').values_list('id', flat=True))
+
+    def capacity_error(self, employee, start, end):
+        """Message explaining why one more person off in [start, end] would exceed the department limit, or None"""
+        department = employee.department
+        if department is None or department.max_on_leave is None:
+            return None
+        if self.peak_on_leave(department.id, start, end) + 1 > department.max_on_leave:
+            return (
+                f'{department.name} already has {department.max_on_leave} '
+                f'{"person" if department.max_on_leave == 1 else "people"} on leave on some of those days.'
+            )
+        return None
+
+    def decide(self, ids, status, user):
+        """
+        Approve or reject many pending requests with one UPDATE. Returns
+        {id: outcome}, the outcome being the new status, 'not_found',
+        'not_pending' or, when approving, 'over_capacity' or
+        'insufficient_balance'.
+        """
+        ids = {int(pk) for pk in ids}
+        outcomes = dict.fromkeys(ids, 'not_found')
+        with transaction.atomic():
+            candidates = list(
+                self.select_for_update(of=('self',)).select_related('employee__user', 'employee__department')
+                .filter(id__in=ids).order_by('created_at', 'id')
+            )
+            pending = []
+            for leave_request in candidates:
+                if leave_request.status == 'pending':
+                    pending.append(leave_request)
+                else:
+                    outcomes[leave_request.id] = 'not_pending'
+            if status == 'approved':
+                pending = self._within_capacity(pending, outcomes)
+                pending = self._within_balance(pending, outcomes)
+
+            if pending:
+                self.filter(id__in=[r.id for r in pending], status='pending').update(
+                    status=status, approved_by=user,
+                )
+                for leave_request in pending:
+                    leave_request.status = status
+                    leave_request.approved_by = user
+                    outcomes[leave_request.id] = status
+                leave_status_changed.send(
+                    sender=self.model, changes=[(r, 'pending') for r in pending], user=user,
+                )
+        return outcomes
+
+    def _within_balance(self, pending, outcomes):
+        """The requests whose days, taken in order, fit the locked leave balances"""
+        tracked = leave_accrual_rates()
+        balances = LeaveBalance.objects.lock(
+            (r.employee_id, r.leave_type) for r in pending if r.leave_type in tracked
+        )
+        accepted = []
+        for leave_request in pending:
+            key = (leave_request.employee_id, leave_request.leave_type)
+            if key in balances:
+                if leave_request.days > balances[key]:
+                    outcomes[leave_request.id] = 'insufficient_balance'
+                    continue
+                balances[key] -= leave_request.days
+            accepted.append(leave_request)
+        return accepted
+
+    def _within_capacity(self, pending, outcomes):
+        """The requests that can be approved, in order, without exceeding their department limits"""
+        capped = {
+            r.employee.department_id for r in pending
+            if r.employee.department is not None and r.employee.department.max_on_leave is not None
+        }
+        if not capped:
+            return pending
+        self.lock_departments(capped)
+
+        window = [r for r in pending if r.employee.department_id in capped]
+        on_leave = defaultdict(lambda: defaultdict(int))
+        approved = self.filter(
+            employee__department_id__in=capped,
+            status='approved',
+            end_date__gte=min(r.start_date for r in window),
+            start_date__lte=max(r.end_date for r in window),
+        ).values_list('employee__department_id', 'start_date', 'end_date')
+        for department_id, start, end in approved:
+            for offset in range((end - start).days + 1):
+                on_leave[department_id][start + timedelta(days=offset)] += 1
+
+        accepted = []
+        for leave_request in pending:
+            department = leave_request.employee.department
+            if department is None or department.id not in capped:
+                accepted.append(leave_request)
+                continue
+            days = [leave_request.start_date + timedelta(days=offset) for offset in range(leave_request.days)]
+            if any(on_leave[department.id][day] + 1 > department.max_on_leave for day in days):
+                outcomes[leave_request.id] = 'over_capacity'
+                continue
+            for day in days:
+                on_leave[department.id][day] += 1
+            accepted.append(leave_request)
+        return accepted
+
 class LeaveRequest(models.Model):
     LEAVE_TYPES = [
         ('annual', 'Annual Leave'),
@@ -27,9 +193,28 @@ class LeaveRequest(models.Model):
     approved_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
 
+    objects = LeaveRequestManager()
+
+    class Meta:
+        indexes = [
+            # Range probes only match the tail of history that ends on or after the window
+            models.Index(fields=['employee', 'end_date'], name='hr_leave_emp_end_idx'),
+            models.Index(fields=['status', 'end_date'], name='hr_leave_status_end_idx'),
+            models.Index(fields=['status', '-created_at'], name='hr_leave_status_created_idx'),
+            models.Index(fields=['employee', 'status', '-created_at'], name='hr_leave_emp_status_idx'),
+            # HR's approval queue only ever looks at pending requests
+            models.Index(fields=['-created_at'], condition=Q(status='pending'), name='hr_leave_pending_idx'),
+            # Keyset pagination of the leave request list
+            models.Index(fields=['-created_at', '-id'], name='hr_leave_created_id_idx'),
+        ]
+
     def __str__(self):
         return f"{self.employee} - {self.leave_type} ({self.status})"
 
+    @property
+    def days(self):
+        return (self.end_date - self.start_date).days + 1
+
 class PerformanceReview(models.Model):
     employee = models.ForeignKey(Employee, on_delete=models.CASCADE)
     reviewer = models.ForeignKey(User, on_delete=models.CASCADE)
@@ -41,6 +226,105 @@ class PerformanceReview(models.Model):
     def __str__(self):
         return f"Review for {self.employee} - {self.rating}/5"
 
+class AttendanceManager(models.Manager):
+    def check_in(self, employee_id, day, at, recorded_by=None):
+        """Record a check-in; returns False if the employee already checked in that day"""
+        try:
+            with transaction.atomic():
+                self.create(
+                    employee_id=employee_id,
+                    date=day,
+                    status='present',
+                    check_in_time=at,
+                    recorded_by=recorded_by,
+                )
+            return True
+        except IntegrityError:
+            pass
+
+        # The row exists already; claim it only if nobody has checked in yet
+        with transaction.atomic():
+            updated = self.filter(
+                employee_id=employee_id, date=day, check_in_time__isnull=True,
+            ).update(status='present', check_in_time=at, recorded_by=recorded_by)
+            if updated:
+                AttendanceSummary.objects.refresh([(employee_id, day.year, day.month)])
+        return bool(updated)
+
+    def check_out(self, employee_id, day, at):
+        """Record a check-out and its working hours; returns False if there is no open check-in"""
+        with transaction.atomic():
+            updated = self.filter(
+                employee_id=employee_id,
+                date=day,
+                check_in_time__isnull=False,
+                check_out_time__isnull=True,
+            ).update(
+                check_out_time=at,
+                working_hours=HoursBetween(F('check_in_time'), Value(at, output_field=models.TimeField())),
+            )
+            if updated:
+                AttendanceSummary.objects.refresh([(employee_id, day.year, day.month)])
+        return bool(updated)
+
+    def mark_absent(self, day, notify=True):
+        """
+        Insert an 'absent' row for every active employee hired by day who has no
+        row for it and isn't on approved leave. Returns the number of rows added.
+        With notify, each of them is also queued an attendance_absent email;
+        back-fills of older days pass notify=False.
+        """
+        qn = connection.ops.quote_name
+        attendance = qn(self.model._meta.db_table)
+        employees = qn(Employee._meta.db_table)
+        users = qn(User._meta.db_table)
+        leaves = qn(LeaveRequest._meta.db_table)
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.execute(
+                f"INSERT INTO {attendance} (employee_id, date, status, notes, check_in_time, "
+                f"check_out_time, working_hours, overtime_hours, recorded_by_id) "
+                f"SELECT e.id, %s, 'absent', '', NULL, NULL, NULL, NULL, NULL "
+                f"FROM {employees} e INNER JOIN {users} u ON u.id = e.user_id "
+                f"WHERE u.is_active = %s AND e.hire_date <= %s "
+                f"AND NOT EXISTS (SELECT 1 FROM {attendance} a WHERE a.employee_id = e.id AND a.date = %s) "
+                f"AND NOT EXISTS (SELECT 1 FROM {leaves} l WHERE l.employee_id = e.id "
+                f"AND l.status = 'approved' AND l.start_date <= %s AND l.end_date >= %s) "
+                f"ON CONFLICT (employee_id, date) DO NOTHING "
+                f"RETURNING employee_id",
+                [day, True, day, day, day, day],
+            )
+            employee_ids = [row[0] for row in cursor.fetchall()]
+            AttendanceSummary.objects.refresh(
+                (employee_id, day.year, day.month) for employee_id in employee_ids
+            )
+            if notify:
+                OutboxEvent.objects.enqueue(
+                    ('attendance_absent', email, {'date': day.isoformat()})
+                    for email in employee_emails(employee_ids)
+                )
+        return len(employee_ids)
+
+    def close_open(self, start, end, cutoff):
+        """
+        Check out every row between start and end that was checked in but never
+        checked out, at the cutoff time. Returns the number of rows closed.
+        """
+        with transaction.atomic():
+            open_rows = self.filter(
+                date__range=(start, end), check_in_time__isnull=False, check_out_time__isnull=True,
+            )
+            keys = set(open_rows.values_list('employee_id', 'date'))
+            closed = open_rows.filter(check_in_time__lt=cutoff).update(
+                check_out_time=cutoff,
+                working_hours=HoursBetween(F('check_in_time'), Value(cutoff, output_field=models.TimeField())),
+            )
+            # Checked in after the cutoff: close the day with no hours
+            closed += open_rows.update(check_out_time=F('check_in_time'), working_hours=Decimal('0'))
+            AttendanceSummary.objects.refresh(
+                (employee_id, day.year, day.month) for employee_id, day in keys
+            )
+        return closed
+
 class Attendance(models.Model):
     ATTENDANCE_CHOICES = [
         ('present', 'Present'),
@@ -55,12 +339,364 @@ class Attendance(models.Model):
     check_in_time = models.TimeField(null=True, blank=True)
     check_out_time = models.TimeField(null=True, blank=True)
     working_hours = models.DecimalField(max_digits=4, decimal_places=2, null=True, blank=True)
+    overtime_hours = models.DecimalField(max_digits=4, decimal_places=2, null=True, blank=True)
     notes = models.TextField(blank=True)
     recorded_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True)
 
+    objects = AttendanceManager()
+
     class Meta:
         unique_together = ['employee', 'date']
         ordering = ['-date']
+        indexes = [
+            models.Index(fields=['date', 'status'], name='hr_attendance_date_status_idx'),
+        ]
 
     def __str__(self):
         return f"{self.employee.user.get_full_name()} - {self.date} ({self.status})"
+
+SUMMARY_FIELDS = [
+    'present_count', 'absent_count', 'late_count', 'half_day_count',
+    'total_count', 'working_hours',
+]
+
+def summary_aggregates():
+    """Aggregates that turn raw Attendance rows into AttendanceSummary columns"""
+    return {
+        'present_count': Count('id', filter=Q(status='present')),
+        'absent_count': Count('id', filter=Q(status='absent')),
+        'late_count': Count('id', filter=Q(status='late')),
+        'half_day_count': Count('id', filter=Q(status='half_day')),
+        'total_count': Count('id'),
+        'working_hours': Coalesce(
+            Sum('working_hours'), Value(Decimal('0')),
+            output_field=DecimalField(max_digits=7, decimal_places=2),
+        ),
+    }
+
+class AttendanceSummaryManager(models.Manager):
+    BATCH_SIZE = 500
+
+    def refresh(self, keys):
+        """Recompute the summaries for an iterable of (employee_id, year, month) keys"""
+        by_month = defaultdict(set)
+        for employee_id, year, month in keys:
+            by_month[(year, month)].add(employee_id)
+
+        with transaction.atomic():
+            for (year, month), employee_ids in by_month.items():
+                month_range = (date(year, month, 1), date(year, month, monthrange(year, month)[1]))
+                employee_ids = sorted(employee_ids)
+                for i in range(0, len(employee_ids), self.BATCH_SIZE):
+                    chunk = employee_ids[i:i + self.BATCH_SIZE]
+                    totals = Attendance.objects.filter(
+                        employee_id__in=chunk, date__range=month_range,
+                    ).order_by().values('employee').annotate(**summary_aggregates())
+
+                    rows = [
+                        self.model(employee_id=row.pop('employee'), year=year, month=month, **row)
+                        for row in totals
+                    ]
+                    self._upsert(rows)
+
+                    # Months whose last Attendance row was deleted
+                    emptied = set(chunk) - {row.employee_id for row in rows}
+                    if emptied:
+                        self.filter(employee_id__in=emptied, year=year, month=month).delete()
+
+            months = list(by_month)
+            transaction.on_commit(lambda: invalidate_months(months))
+
+    def rebuild(self):
+        """
+        Recompute the summaries from the raw Attendance table, from the earliest
+        month that still has raw rows on. Earlier summaries are kept: their rows
+        were archived (see archive_attendance_partitions) and can't be recounted.
+        """
+        created = 0
+        with transaction.atomic():
+            first_day = Attendance.objects.order_by().aggregate(first=Min('date'))['first']
+            if first_day is None:
+                return created
+            self.filter(
+                Q(year__gt=first_day.year) | Q(year=first_day.year, month__gte=first_day.month)
+            ).delete()
+            totals = Attendance.objects.order_by().annotate(
+                year=ExtractYear('date'),
+                month=ExtractMonth('date'),
+            ).values('employee', 'year', 'month').annotate(**summary_aggregates())
+
+            batch = []
+            months = set()
+            for row in totals.iterator(chunk_size=self.BATCH_SIZE):
+                months.add((row['year'], row['month']))
+                batch.append(self.model(employee_id=row.pop('employee'), **row))
+                if len(batch) >= self.BATCH_SIZE:
+                    created += len(self.bulk_create(batch))
+                    batch = []
+            if batch:
+                created += len(self.bulk_create(batch))
+            transaction.on_commit(lambda: invalidate_months(months))
+        return created
+
+    def _upsert(self, rows):
+        if rows:
+            self.bulk_create(
+                rows,
+                update_conflicts=True,
+                unique_fields=['employee', 'year', 'month'],
+                update_fields=SUMMARY_FIELDS,
+            )
+
+class AttendanceSummary(models.Model):
+    """Per-employee monthly rollup of Attendance, kept in step with every write"""
+    employee = models.ForeignKey(Employee, on_delete=models.CASCADE, related_name='attendance_summaries')
+    year = models.PositiveSmallIntegerField()
+    month = models.PositiveSmallIntegerField()
+    present_count = models.PositiveIntegerField(default=0)
+    absent_count = models.PositiveIntegerField(default=0)
+    late_count = models.PositiveIntegerField(default=0)
+    half_day_count = models.PositiveIntegerField(default=0)
+    total_count = models.PositiveIntegerField(default=0)
+    working_hours = models.DecimalField(max_digits=7, decimal_places=2, default=0)
+
+    objects = AttendanceSummaryManager()
+
+    class Meta:
+        unique_together = ['employee', 'year', 'month']
+        ordering = ['-year', '-month']
+
+    def __str__(self):
+        return f"{self.employee} - {self.year}-{self.month:02d}"
+
+def employee_emails(employee_ids):
+    """Notification address of each employee, skipping those without one"""
+    rows = Employee.objects.filter(id__in=employee_ids).values_list('user__emailid', 'user__email')
+    return [emailid or email for emailid, email in rows if emailid or email]
+
+def leave_accrual_rates():
+    """{leave type: days accrued per month}; types missing here are only granted by adjustment"""
+    return {
+        leave_type: Decimal(str(days))
+        for leave_type, days in getattr(settings, 'LEAVE_ACCRUAL', {}).items()
+    }
+
+def leave_opening_balances():
+    """{leave type: days credited to a new employee}"""
+    return {
+        leave_type: Decimal(str(days))
+        for leave_type, days in getattr(settings, 'LEAVE_OPENING_BALANCE', {}).items()
+    }
+
+class LeaveLedgerManager(models.Manager):
+    def post(self, entries):
+        """
+        Insert ledger entries and apply their net effect to LeaveBalance in the
+        same transaction: one UPDATE per distinct (leave type, amount) pair
+        rather than one per entry.
+        """
+        entries = list(entries)
+        if not entries:
+            return []
+
+        deltas = defaultdict(Decimal)
+        for entry in entries:
+            deltas[(entry.employee_id, entry.leave_type)] += Decimal(entry.days)
+
+        by_amount = defaultdict(list)
+        for (employee_id, leave_type), delta in deltas.items():
+            if delta:
+                by_amount[(leave_type, delta)].append(employee_id)
+
+        with transaction.atomic():
+            created = self.bulk_create(entries)
+            LeaveBalance.objects.bulk_create(
+                [LeaveBalance(employee_id=employee_id, leave_type=leave_type) for employee_id, leave_type in deltas],
+                ignore_conflicts=True,
+            )
+            for (leave_type, delta), employee_ids in by_amount.items():
+                LeaveBalance.objects.filter(
+                    employee_id__in=employee_ids, leave_type=leave_type,
+                ).update(balance=F('balance') + delta)
+        return created
+
+    def post_status_changes(self, changes, user=None):
+        """
+        Ledger entries for leave requests whose status changed, given as
+        (leave request, previous status) pairs: approving consumes the days,
+        moving an approved request to any other status gives them back. Leave
+        types without an accrual rate have no balance and are skipped.
+        """
+        tracked = leave_accrual_rates()
+        entries = []
+        for leave_request, previous_status in changes:
+            if leave_request.leave_type not in tracked:
+                continue
+            if leave_request.status == 'approved' and previous_status != 'approved':
+                entry_type, days, note = 'consumption', -leave_request.days, ''
+            elif previous_status == 'approved' and leave_request.status != 'approved':
+                entry_type, days, note = 'adjustment', leave_request.days, f'Reversal of approved request #{leave_request.pk}'
+            else:
+                continue
+            entries.append(self.model(
+                employee_id=leave_request.employee_id,
+                leave_type=leave_request.leave_type,
+                entry_type=entry_type,
+                days=days,
+                leave_request=leave_request,
+                note=note,
+                created_by=user,
+            ))
+        return self.post(entries)
+
+    def seed_opening_balances(self, employee_ids):
+        """Credit settings.LEAVE_OPENING_BALANCE to the given employees that haven't had it yet"""
+        employee_ids = list(employee_ids)
+        amounts = leave_opening_balances()
+        seeded = set(self.filter(
+            employee_id__in=employee_ids, entry_type='opening',
+        ).values_list('employee_id', 'leave_type'))
+        return self.post(
+            self.model(
+                employee_id=employee_id,
+                leave_type=leave_type,
+                entry_type='opening',
+                days=days,
+                note='Opening balance',
+            )
+            for employee_id in employee_ids
+            for leave_type, days in amounts.items()
+            if days and (employee_id, leave_type) not in seeded
+        )
+
+class LeaveLedgerEntry(models.Model):
+    """Append-only record of every change to an employee's leave entitlement"""
+    ENTRY_TYPES = [
+        ('opening', 'Opening Balance'),
+        ('accrual', 'Accrual'),
+        ('consumption', 'Consumption'),
+        ('adjustment', 'Adjustment'),
+    ]
+
+    employee = models.ForeignKey(Employee, on_delete=models.CASCADE, related_name='leave_ledger')
+    leave_type = models.CharField(max_length=20, choices=LeaveRequest.LEAVE_TYPES)
+    entry_type = models.CharField(max_length=20, choices=ENTRY_TYPES)
+    days = models.DecimalField(max_digits=6, decimal_places=2)
+    period = models.DateField(null=True, blank=True, help_text="First day of the month an accrual is for")
+    leave_request = models.ForeignKey(LeaveRequest, on_delete=models.SET_NULL, null=True, blank=True, related_name='ledger_entries')
+    note = models.CharField(max_length=255, blank=True)
+    created_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    objects = LeaveLedgerManager()
+
+    class Meta:
+        ordering = ['-created_at']
+        constraints = [
+            # A month's accrual is posted at most once per employee and type
+            models.UniqueConstraint(
+                fields=['employee', 'leave_type', 'period'],
+                condition=Q(entry_type='accrual'),
+                name='hr_ledger_one_accrual_per_period',
+            ),
+            models.UniqueConstraint(
+                fields=['employee', 'leave_type'],
+                condition=Q(entry_type='opening'),
+                name='hr_ledger_one_opening_balance',
+            ),
+        ]
+        indexes = [
+            models.Index(fields=['employee', 'leave_type', '-created_at'], name='hr_ledger_emp_type_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.employee} - {self.entry_type} {self.days} {self.leave_type}"
+
+class LeaveBalanceManager(models.Manager):
+    def lock(self, pairs):
+        """
+        {(employee id, leave type): balance} for the given pairs, with their rows
+        locked until the end of the transaction; missing rows are created at 0
+        so there is always a row to lock.
+        """
+        pairs = set(pairs)
+        if not pairs:
+            return {}
+        self.bulk_create(
+            [self.model(employee_id=employee_id, leave_type=leave_type) for employee_id, leave_type in pairs],
+            ignore_conflicts=True,
+        )
+        employee_ids = {employee_id for employee_id, _ in pairs}
+        leave_types = {leave_type for _, leave_type in pairs}
+        rows = self.select_for_update().filter(
+            employee_id__in=employee_ids, leave_type__in=leave_types,
+        ).order_by('id').values_list('employee_id', 'leave_type', 'balance')
+        return {
+            (employee_id, leave_type): balance
+            for employee_id, leave_type, balance in rows
+            if (employee_id, leave_type) in pairs
+        }
+
+class LeaveBalance(models.Model):
+    """Running total of LeaveLedgerEntry.days per employee and leave type"""
+    employee = models.ForeignKey(Employee, on_delete=models.CASCADE, related_name='leave_balances')
+    leave_type = models.CharField(max_length=20, choices=LeaveRequest.LEAVE_TYPES)
+    balance = models.DecimalField(max_digits=7, decimal_places=2, default=0)
+
+    objects = LeaveBalanceManager()
+
+    class Meta:
+        unique_together = ['employee', 'leave_type']
+        ordering = ['leave_type']
+
+    def __str__(self):
+        return f"{self.employee} - {self.leave_type}: {self.balance}"
+
+class OutboxEventManager(models.Manager):
+    def enqueue(self, events):
+        """
+        Queue (event type, recipient, payload) notifications. Call inside the
+        transaction that makes the change so the two commit or roll back together.
+        """
+        return self.bulk_create([
+            self.model(event_type=event_type, recipient=recipient, payload=payload)
+            for event_type, recipient, payload in events
+            if recipient
+        ])
+
+class OutboxEvent(models.Model):
+    """Notification waiting to be emailed by the dispatch_notifications command"""
+    EVENT_TYPES = [
+        ('leave_submitted', 'Leave Submitted'),
+        ('leave_approved', 'Leave Approved'),
+        ('leave_rejected', 'Leave Rejected'),
+        ('attendance_absent', 'Marked Absent'),
+    ]
+
+    STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('sent', 'Sent'),
+        ('failed', 'Failed'),
+    ]
+
+    event_type = models.CharField(max_length=30, choices=EVENT_TYPES)
+    recipient = models.EmailField()
+    payload = models.JSONField(default=dict)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='pending')
+    attempts = models.PositiveSmallIntegerField(default=0)
+    available_at = models.DateTimeField(default=timezone.now, help_text="Not dispatched before this time; pushed back on retries")
+    sent_at = models.DateTimeField(null=True, blank=True)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    objects = OutboxEventManager()
+
+    class Meta:
+        ordering = ['created_at']
+        indexes = [
+            # The dispatcher only ever scans events that are still due
+            models.Index(fields=['available_at', 'id'], condition=Q(status='pending'), name='hr_outbox_due_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.event_type} to {self.recipient} ({self.status})"
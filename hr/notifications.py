@@ -0,0 +1,111 @@
+"""
+Email delivery of queued OutboxEvent notifications.
+
+A batch of due events is claimed by pushing their available_at past a short
+lease (with SKIP LOCKED on PostgreSQL, so concurrent workers take different
+rows), then grouped by recipient: every recipient gets one digest email for
+the batch, all sent over a single connection from Django's email backend.
+Failed recipients are retried with exponential backoff until max_attempts.
+"""
+from collections import defaultdict
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .models import OutboxEvent
+
+LEASE = timedelta(minutes=5)  # How long a claimed batch is hidden from other workers
+MAX_BACKOFF = timedelta(hours=6)
+
+SUBJECTS = {
+    'leave_submitted': 'Leave request from {employee}',
+    'leave_approved': 'Your leave request was approved',
+    'leave_rejected': 'Your leave request was rejected',
+    'attendance_absent': 'You were marked absent on {date}',
+}
+
+LINES = {
+    'leave_submitted': '{employee} requested {leave_type} from {start_date} to {end_date}: {reason}',
+    'leave_approved': 'Your {leave_type} from {start_date} to {end_date} was approved by {decided_by}.',
+    'leave_rejected': 'Your {leave_type} from {start_date} to {end_date} was rejected by {decided_by}.',
+    'attendance_absent': 'You were marked absent on {date}. Contact HR if this is wrong.',
+}
+
+
+def render_line(event):
+    return LINES[event.event_type].format_map(defaultdict(str, event.payload))
+
+
+def digest(recipient, events):
+    """One email covering every event for a recipient"""
+    if len(events) == 1:
+        subject = SUBJECTS[events[0].event_type].format_map(defaultdict(str, events[0].payload))
+        body = render_line(events[0])
+    else:
+        subject = f'{len(events)} HR notifications'
+        body = '\n'.join(f'- {render_line(event)}' for event in events)
+    return EmailMessage(subject, body, settings.DEFAULT_FROM_EMAIL, [recipient])
+
+
+def claim(batch_size):
+    """Due pending events, leased to this worker"""
+    now = timezone.now()
+    with transaction.atomic():
+        events = list(
+            OutboxEvent.objects.select_for_update(skip_locked=True)
+            .filter(status='pending', available_at__lte=now)
+            .order_by('available_at', 'id')[:batch_size]
+        )
+        OutboxEvent.objects.filter(id__in=[event.id for event in events]).update(available_at=now + LEASE)
+    return events
+
+
+def dispatch(batch_size=200, max_attempts=5, backoff=timedelta(minutes=1)):
+    """Send one batch; returns (emails sent, events sent, events retried, events failed)"""
+    events = claim(batch_size)
+    if not events:
+        return 0, 0, 0, 0
+
+    by_recipient = defaultdict(list)
+    for event in events:
+        by_recipient[event.recipient].append(event)
+
+    sent, errors = [], {}
+    try:
+        with get_connection() as connection:
+            for recipient, recipient_events in by_recipient.items():
+                try:
+                    connection.send_messages([digest(recipient, recipient_events)])
+                    sent.extend(recipient_events)
+                except Exception as e:
+                    for event in recipient_events:
+                        errors[event.id] = f'{type(e).__name__}: {e}'
+    except Exception as e:
+        # Couldn't open (or close) the connection; anything not sent is retried
+        sent_ids = {event.id for event in sent}
+        for event in events:
+            if event.id not in sent_ids:
+                errors.setdefault(event.id, f'{type(e).__name__}: {e}')
+
+    now = timezone.now()
+    OutboxEvent.objects.filter(id__in=[event.id for event in sent]).update(
+        status='sent', sent_at=now, attempts=F('attempts') + 1, last_error='',
+    )
+
+    retried = failed = 0
+    failures = [event for event in events if event.id in errors]
+    for event in failures:
+        event.attempts += 1
+        event.last_error = errors[event.id]
+        if event.attempts >= max_attempts:
+            event.status = 'failed'
+            failed += 1
+        else:
+            event.available_at = now + min(backoff * 2 ** (event.attempts - 1), MAX_BACKOFF)
+            retried += 1
+    OutboxEvent.objects.bulk_update(failures, ['attempts', 'last_error', 'status', 'available_at'])
+    return len(by_recipient) - len({event.recipient for event in failures}), len(sent), retried, failed
@@ -0,0 +1,189 @@
+"""
+Monthly range partitioning of hr_attendance on PostgreSQL.
+
+Partitioning is opt-in: with settings.ATTENDANCE_PARTITIONING on and a
+PostgreSQL database, create_attendance_partitions --convert rebuilds the table;
+everywhere else these helpers are never called and Attendance stays an
+ordinary table. Partitions are named hr_attendance_YYYYMM
+and cover [first day of month, first day of next month). Rows for months that
+have no partition yet land in hr_attendance_default.
+"""
+from datetime import date
+
+from django.conf import settings
+
+TABLE = 'hr_attendance'
+DEFAULT_PARTITION = f'{TABLE}_default'
+
+
+def partitioning_enabled(connection):
+    return connection.vendor == 'postgresql' and getattr(settings, 'ATTENDANCE_PARTITIONING', False)
+
+
+def month_start(day):
+    return date(day.year, day.month, 1)
+
+
+def add_months(day, months):
+    month_index = day.year * 12 + day.month - 1 + months
+    return date(month_index // 12, month_index % 12 + 1, 1)
+
+
+def partition_name(first_day):
+    return f'{TABLE}_{first_day:%Y%m}'
+
+
+def is_partitioned(cursor):
+    cursor.execute(
+        "SELECT c.relkind FROM pg_class c JOIN pg_namespace n ON n.oid = c.relnamespace "
+        "WHERE c.relname = %s AND n.nspname = current_schema()",
+        [TABLE],
+    )
+    row = cursor.fetchone()
+    return row is not None and row[0] == 'p'
+
+
+def month_partitions(cursor):
+    """{first day of month: partition name} for every attached monthly partition"""
+    cursor.execute(
+        "SELECT child.relname FROM pg_inherits i "
+        "JOIN pg_class parent ON parent.oid = i.inhparent "
+        "JOIN pg_class child ON child.oid = i.inhrelid "
+        "WHERE parent.relname = %s",
+        [TABLE],
+    )
+    partitions = {}
+    for (name,) in cursor.fetchall():
+        suffix = name[len(TABLE) + 1:]
+        if suffix.isdigit() and len(suffix) == 6:
+            partitions[date(int(suffix[:4]), int(suffix[4:]), 1)] = name
+    return partitions
+
+
+def create_month_partition(cursor, first_day):
+    """Create and attach the partition for first_day's month, moving any rows out of the default partition"""
+    name = partition_name(first_day)
+    end = add_months(first_day, 1)
+    cursor.execute(f'CREATE TABLE "{name}" (LIKE "{TABLE}" INCLUDING DEFAULTS INCLUDING CONSTRAINTS)')
+    cursor.execute(
+        f'WITH moved AS (DELETE FROM "{DEFAULT_PARTITION}" WHERE "date" >= %s AND "date" < %s RETURNING *) '
+        f'INSERT INTO "{name}" SELECT * FROM moved',
+        [first_day, end],
+    )
+    cursor.execute(
+        f'ALTER TABLE "{TABLE}" ATTACH PARTITION "{name}" FOR VALUES FROM (%s) TO (%s)',
+        [first_day, end],
+    )
+    return name
+
+
+def ensure_partitions(cursor, start, through):
+    """Create every missing monthly partition from start's month up to and including through's month"""
+    existing = month_partitions(cursor)
+    created = []
+    first_day = month_start(start)
+    while first_day <= month_start(through):
+        if first_day not in existing:
+            created.append(create_month_partition(cursor, first_day))
+        first_day = add_months(first_day, 1)
+    return created
+
+
+def detach_month_partition(cursor, name, archive_schema=None):
+    """Detach a monthly partition, then move it to archive_schema or drop it when that is None"""
+    cursor.execute(f'ALTER TABLE "{TABLE}" DETACH PARTITION "{name}"')
+    # Nothing inserts into a detached month; without this its id default would
+    # keep hr_attendance_id_seq from being dropped when the table is rebuilt
+    cursor.execute(f'ALTER TABLE "{name}" ALTER COLUMN id DROP DEFAULT')
+    if archive_schema is None:
+        cursor.execute(f'DROP TABLE "{name}"')
+    else:
+        cursor.execute(f'CREATE SCHEMA IF NOT EXISTS "{archive_schema}"')
+        cursor.execute(f'ALTER TABLE "{name}" SET SCHEMA "{archive_schema}"')
+
+
+def convert_to_partitioned(cursor, months_ahead=3):
+    """Rebuild hr_attendance as a table partitioned by month, keeping its rows, indexes and constraints"""
+    old = f'{TABLE}_unpartitioned'
+
+    # Capture the definitions before the old table (and its index names) goes away
+    cursor.execute(
+        "SELECT conname, pg_get_constraintdef(oid), contype FROM pg_constraint "
+        "WHERE conrelid = %s::regclass AND contype IN ('p', 'u', 'f')",
+        [TABLE],
+    )
+    constraints = cursor.fetchall()
+    cursor.execute(
+        "SELECT indexdef FROM pg_indexes WHERE tablename = %s AND indexname NOT IN ("
+        "SELECT conname FROM pg_constraint WHERE conrelid = %s::regclass)",
+        [TABLE, TABLE],
+    )
+    indexes = [row[0] for row in cursor.fetchall()]
+    cursor.execute(f'SELECT MIN("date"), MAX("date"), MAX(id) FROM "{TABLE}"')
+    min_date, max_date, max_id = cursor.fetchone()
+
+    cursor.execute(f'ALTER TABLE "{TABLE}" RENAME TO "{old}"')
+    # Identity columns can't live on a partitioned parent before PostgreSQL 17,
+    # so the id comes from a plain sequence that takes over the old one's name
+    cursor.execute(f'ALTER TABLE "{old}" ALTER COLUMN id DROP IDENTITY IF EXISTS')
+    cursor.execute(f'ALTER TABLE "{old}" ALTER COLUMN id DROP DEFAULT')
+    cursor.execute(f'DROP SEQUENCE IF EXISTS "{TABLE}_id_seq"')
+    cursor.execute(
+        f'CREATE TABLE "{TABLE}" (LIKE "{old}" INCLUDING DEFAULTS) PARTITION BY RANGE ("date")'
+    )
+    cursor.execute(f'CREATE SEQUENCE "{TABLE}_id_seq" OWNED BY "{TABLE}".id')
+    cursor.execute(f'ALTER TABLE "{TABLE}" ALTER COLUMN id SET DEFAULT nextval(\'"{TABLE}_id_seq"\')')
+    cursor.execute(f'SELECT setval(\'"{TABLE}_id_seq"\', %s, false)', [(max_id or 0) + 1])
+    cursor.execute(f'CREATE TABLE "{DEFAULT_PARTITION}" PARTITION OF "{TABLE}" DEFAULT')
+
+    first_day = month_start(min_date or date.today())
+    last_day = add_months(month_start(max(max_date or date.today(), date.today())), months_ahead)
+    while first_day <= last_day:
+        cursor.execute(
+            f'CREATE TABLE "{partition_name(first_day)}" PARTITION OF "{TABLE}" '
+            f'FOR VALUES FROM (%s) TO (%s)',
+            [first_day, add_months(first_day, 1)],
+        )
+        first_day = add_months(first_day, 1)
+
+    cursor.execute(f'INSERT INTO "{TABLE}" SELECT * FROM "{old}"')
+    cursor.execute(f'DROP TABLE "{old}"')
+
+    # Unique keys on a partitioned table must contain the partition key
+    for name, definition, kind in constraints:
+        if kind == 'p':
+            definition = 'PRIMARY KEY (id, "date")'
+        cursor.execute(f'ALTER TABLE "{TABLE}" ADD CONSTRAINT "{name}" {definition}')
+    # The captured definitions name hr_attendance, which is now the partitioned parent
+    for definition in indexes:
+        cursor.execute(definition)
+
+
+def convert_to_plain(cursor):
+    """Undo convert_to_partitioned: copy every partition back into one ordinary table"""
+    partitioned = f'{TABLE}_partitioned'
+    cursor.execute(
+        "SELECT conname, pg_get_constraintdef(oid), contype FROM pg_constraint "
+        "WHERE conrelid = %s::regclass AND contype IN ('p', 'u', 'f') AND conparentid = 0",
+        [TABLE],
+    )
+    constraints = cursor.fetchall()
+    cursor.execute(
+        "SELECT indexdef FROM pg_indexes WHERE tablename = %s AND indexname NOT IN ("
+        "SELECT conname FROM pg_constraint WHERE conrelid = %s::regclass)",
+        [TABLE, TABLE],
+    )
+    indexes = [row[0] for row in cursor.fetchall()]
+
+    cursor.execute(f'ALTER TABLE "{TABLE}" RENAME TO "{partitioned}"')
+    cursor.execute(f'CREATE TABLE "{TABLE}" (LIKE "{partitioned}" INCLUDING DEFAULTS)')
+    cursor.execute(f'INSERT INTO "{TABLE}" SELECT * FROM "{partitioned}"')
+    cursor.execute(f'ALTER SEQUENCE "{TABLE}_id_seq" OWNED BY "{TABLE}".id')
+    cursor.execute(f'DROP TABLE "{partitioned}" CASCADE')
+
+    for name, definition, kind in constraints:
+        if kind == 'p':
+            definition = 'PRIMARY KEY (id)'
+        cursor.execute(f'ALTER TABLE "{TABLE}" ADD CONSTRAINT "{name}" {definition}')
+    for definition in indexes:
+        cursor.execute(definition.replace(' ON ONLY ', ' ON ', 1))
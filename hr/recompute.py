@@ -0,0 +1,193 @@
+"""
+Vectorized recomputation of working and overtime hours.
+
+Check-in/check-out times are stored as naive times in settings.TIME_ZONE. The
+engine loads them for a date range in chunks, already converted to seconds
+since midnight by the database, turns each chunk into NumPy arrays, moves them
+into every employee's own time zone to apply the shift window, then deducts
+breaks and splits off overtime for the whole chunk at once. A shift whose end
+is not after its start (e.g. 22:00-06:00) runs past midnight. Only rows whose
+hours actually change are written back, with bulk_update in batches, and the
+touched AttendanceSummary months are refreshed.
+"""
+from datetime import datetime, time
+from decimal import Decimal
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+import numpy as np
+from django.conf import settings
+from django.db import transaction
+from django.db.models import IntegerField
+from django.db.models.functions import Cast, ExtractHour, ExtractMinute, ExtractSecond
+
+from .models import Attendance, AttendanceSummary
+
+DEFAULT_SHIFT = {
+    'start': '09:00',  # Local shift start; earlier arrivals only count with count_early_arrival
+    'end': '18:00',  # Local shift end; later departures only count with count_late_departure
+    'count_early_arrival': False,
+    'count_late_departure': True,
+    'break_minutes': 60,  # Unpaid break deducted from long enough days
+    'break_after_hours': 6,  # Days at least this long get the break deducted
+    'overtime_after_hours': 8,  # Daily hours beyond this are overtime
+}
+
+MAX_HOURS = Decimal('99.99')  # Largest value the 4-digit hour columns hold
+DAY_SECONDS = 24 * 60 * 60
+
+
+def shift_rules(overrides=None):
+    rules = {**DEFAULT_SHIFT, **getattr(settings, 'ATTENDANCE_SHIFT', {}), **(overrides or {})}
+    rules['start_seconds'] = _seconds(time.fromisoformat(rules['start']))
+    rules['end_seconds'] = _seconds(time.fromisoformat(rules['end']))
+    if rules['end_seconds'] <= rules['start_seconds']:
+        # Night shift: it ends on the next day
+        rules['end_seconds'] += DAY_SECONDS
+    return rules
+
+
+def compute_hours(check_in, check_out, offsets, rules):
+    """
+    Working and overtime hours for arrays of check-in/check-out seconds since
+    midnight (storage time zone) and the per-row offset to local time in seconds.
+    """
+    check_in = check_in.astype(np.int64)
+    check_out = check_out.astype(np.int64)
+    # A check-out earlier than the check-in crossed midnight
+    check_out = np.where(check_out < check_in, check_out + DAY_SECONDS, check_out)
+
+    local_in = check_in + offsets
+    local_out = check_out + offsets
+    # The shift is the one of the local day the check-in falls on; the offset can
+    # move it to the previous or next day. A night shift's day runs from one
+    # morning's shift end to the next, so arriving after midnight is still late.
+    length = rules['end_seconds'] - rules['start_seconds']
+    day_start = max(rules['end_seconds'] - DAY_SECONDS, 0)
+    shift_start = rules['start_seconds'] + (local_in - day_start) // DAY_SECONDS * DAY_SECONDS
+    if not rules['count_early_arrival']:
+        local_in = np.maximum(local_in, shift_start)
+    if not rules['count_late_departure']:
+        local_out = np.minimum(local_out, shift_start + length)
+    worked = np.maximum(local_out - local_in, 0)
+
+    break_seconds = rules['break_minutes'] * 60
+    worked = np.where(worked >= rules['break_after_hours'] * 3600, worked - break_seconds, worked)
+    worked = np.maximum(worked, 0)
+
+    working_hours = np.round(worked / 3600, 2)
+    overtime_hours = np.round(np.maximum(working_hours - rules['overtime_after_hours'], 0), 2)
+    cap = float(MAX_HOURS)
+    return np.minimum(working_hours, cap), np.minimum(overtime_hours, cap)
+
+
+def recompute(start, end, employee_ids=None, rules=None, chunk_size=50000, batch_size=1000, dry_run=False):
+    """Recompute hours for every closed Attendance row between start and end; returns (rows seen, rows changed)"""
+    rules = shift_rules(rules)
+    rows = Attendance.objects.filter(
+        date__range=(start, end),
+        check_in_time__isnull=False,
+        check_out_time__isnull=False,
+    ).order_by().annotate(
+        check_in_seconds=_time_seconds('check_in_time'),
+        check_out_seconds=_time_seconds('check_out_time'),
+    ).values_list(
+        'id', 'employee_id', 'date', 'check_in_seconds', 'check_out_seconds',
+        'working_hours', 'overtime_hours', 'employee__time_zone',
+    )
+    if employee_ids:
+        rows = rows.filter(employee_id__in=employee_ids)
+
+    offsets = _OffsetCache()
+    seen = changed = 0
+    chunk = []
+    for row in rows.iterator(chunk_size=chunk_size):
+        chunk.append(row)
+        if len(chunk) >= chunk_size:
+            changed += _recompute_chunk(chunk, offsets, rules, batch_size, dry_run)
+            seen += len(chunk)
+            chunk = []
+    if chunk:
+        changed += _recompute_chunk(chunk, offsets, rules, batch_size, dry_run)
+        seen += len(chunk)
+    return seen, changed
+
+
+def _recompute_chunk(chunk, offsets, rules, batch_size, dry_run):
+    ids, employee_ids, dates, check_ins, check_outs, old_hours, old_overtime, zones = zip(*chunk)
+
+    working_hours, overtime_hours = compute_hours(
+        np.array(check_ins, dtype=np.int64),
+        np.array(check_outs, dtype=np.int64),
+        offsets.array(zones, dates),
+        rules,
+    )
+    # None becomes NaN, so rows never computed always count as changed
+    old_hours = np.array(old_hours, dtype=np.float64)
+    old_overtime = np.array(old_overtime, dtype=np.float64)
+    changed = np.flatnonzero(
+        ~np.isclose(old_hours, working_hours) | ~np.isclose(old_overtime, overtime_hours)
+    )
+    if dry_run or not len(changed):
+        return len(changed)
+
+    updates = [
+        Attendance(
+            id=ids[i],
+            working_hours=Decimal(f'{working_hours[i]:.2f}'),
+            overtime_hours=Decimal(f'{overtime_hours[i]:.2f}'),
+        )
+        for i in changed
+    ]
+    with transaction.atomic():
+        Attendance.objects.bulk_update(updates, ['working_hours', 'overtime_hours'], batch_size=batch_size)
+        AttendanceSummary.objects.refresh(
+            (employee_ids[i], dates[i].year, dates[i].month) for i in changed
+        )
+    return len(changed)
+
+
+def _seconds(value):
+    return value.hour * 3600 + value.minute * 60 + value.second
+
+
+def _time_seconds(field):
+    """Whole seconds since midnight of a TimeField, computed in the database"""
+    return Cast(ExtractHour(field) * 3600 + ExtractMinute(field) * 60 + ExtractSecond(field), IntegerField())
+
+
+class _OffsetCache:
+    """Seconds to add to a storage-time-zone time to get an employee's local time, per (zone, date)"""
+
+    def __init__(self):
+        self.storage_zone = ZoneInfo(settings.TIME_ZONE)
+        self.zones = {}
+        self.offsets = {}
+
+    def array(self, zones, dates):
+        """Offsets for parallel sequences of zone names and dates, looking up each distinct pair once"""
+        names, zone_codes = np.unique(np.array(zones, dtype=str), return_inverse=True)
+        days = np.array(dates, dtype='datetime64[D]').astype(np.int64)
+        pairs = np.column_stack((zone_codes.reshape(-1), days))
+        _, first, inverse = np.unique(pairs, axis=0, return_index=True, return_inverse=True)
+        distinct = np.fromiter(
+            (self.get(str(names[zone_codes[i]]), dates[i]) for i in first), dtype=np.int64, count=len(first),
+        )
+        return distinct[inverse.reshape(-1)]
+
+    def get(self, zone_name, day):
+        key = (zone_name, day)
+        if key not in self.offsets:
+            zone = self._zone(zone_name)
+            noon = datetime.combine(day, time(12))
+            local = noon.replace(tzinfo=zone).utcoffset()
+            storage = noon.replace(tzinfo=self.storage_zone).utcoffset()
+            self.offsets[key] = int((local - storage).total_seconds())
+        return self.offsets[key]
+
+    def _zone(self, name):
+        if name not in self.zones:
+            try:
+                self.zones[name] = ZoneInfo(name) if name else self.storage_zone
+            except (ZoneInfoNotFoundError, ValueError):
+                self.zones[name] = self.storage_zone
+        return self.zones[name]
@@ -0,0 +1,96 @@
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from employee.models import Employee
+from .models import Attendance, AttendanceSummary, LeaveLedgerEntry, LeaveRequest, OutboxEvent, leave_status_changed
+from .calendar_strip import invalidate_roster
+from .team_calendar import invalidate_departments
+
+@receiver(post_save, sender=Attendance)
+@receiver(post_delete, sender=Attendance)
+def refresh_attendance_summary(sender, instance, **kwargs):
+    """Keep the monthly rollup in step with single-row Attendance writes"""
+    AttendanceSummary.objects.refresh([
+        (instance.employee_id, instance.date.year, instance.date.month)
+    ])
+
+@receiver(post_save, sender=Employee)
+@receiver(post_delete, sender=Employee)
+def invalidate_attendance_calendar_roster(sender, instance, **kwargs):
+    """Cached calendar pages list employees by name and department"""
+    transaction.on_commit(invalidate_roster)
+
+@receiver(post_save, sender=get_user_model())
+def invalidate_attendance_calendar_names(sender, instance, created, update_fields=None, **kwargs):
+    """Names shown on the calendar live on the user; last_login updates and the like are skipped"""
+    if not created and (update_fields is None or {'first_name', 'last_name', 'username'} & set(update_fields)):
+        transaction.on_commit(invalidate_roster)
+
+@receiver(post_save, sender=Employee)
+def seed_opening_leave_balances(sender, instance, created, **kwargs):
+    if created:
+        LeaveLedgerEntry.objects.seed_opening_balances([instance.id])
+
+@receiver(leave_status_changed, sender=LeaveRequest)
+def post_leave_ledger_entries(sender, changes, user, **kwargs):
+    """Consume or give back leave balance for a whole batch of decisions at once"""
+    LeaveLedgerEntry.objects.post_status_changes(changes, user)
+
+@receiver(leave_status_changed, sender=LeaveRequest)
+def invalidate_team_calendars(sender, changes, **kwargs):
+    """Cached team rosters of the departments in a batch are stale once it commits"""
+    department_ids = {leave_request.employee.department_id for leave_request, _ in changes}
+    transaction.on_commit(lambda: invalidate_departments(department_ids))
+
+@receiver(post_save, sender=LeaveRequest)
+def invalidate_team_calendar_on_save(sender, instance, created, **kwargs):
+    """Single-row saves, e.g. from the admin; a new pending request isn't on any roster yet"""
+    if created and instance.status != 'approved':
+        return
+    department_id = instance.employee.department_id
+    transaction.on_commit(lambda: invalidate_departments([department_id]))
+
+@receiver(post_delete, sender=LeaveRequest)
+def invalidate_team_calendar_on_delete(sender, instance, **kwargs):
+    if instance.status == 'approved':
+        department_id = instance.employee.department_id
+        transaction.on_commit(lambda: invalidate_departments([department_id]))
+
+def _leave_payload(leave_request, **extra):
+    employee = leave_request.employee
+    return {
+        'leave_request': leave_request.pk,
+        'employee': employee.user.get_full_name() or employee.user.username,
+        'leave_type': leave_request.get_leave_type_display(),
+        'start_date': leave_request.start_date.isoformat(),
+        'end_date': leave_request.end_date.isoformat(),
+        **extra,
+    }
+
+@receiver(leave_status_changed, sender=LeaveRequest)
+def queue_leave_decision_notifications(sender, changes, user, **kwargs):
+    """Tell employees their request was decided, in the same transaction as the decision"""
+    decided_by = (user.get_full_name() or user.username) if user else ''
+    OutboxEvent.objects.enqueue(
+        (
+            f'leave_{leave_request.status}',
+            leave_request.employee.user.emailid or leave_request.employee.user.email,
+            _leave_payload(leave_request, decided_by=decided_by),
+        )
+        for leave_request, previous_status in changes
+        if leave_request.status in ('approved', 'rejected') and leave_request.status != previous_status
+    )
+
+@receiver(post_save, sender=LeaveRequest)
+def queue_leave_submitted_notifications(sender, instance, created, **kwargs):
+    """Tell the department manager and HR_NOTIFICATION_EMAILS about a new request"""
+    if not created or instance.status != 'pending':
+        return
+    recipients = set(getattr(settings, 'HR_NOTIFICATION_EMAILS', []))
+    department = instance.employee.department
+    if department is not None and department.manager is not None:
+        recipients.add(department.manager.emailid or department.manager.email)
+    payload = _leave_payload(instance, reason=instance.reason)
+    OutboxEvent.objects.enqueue(('leave_submitted', recipient, payload) for recipient in recipients)
@@ -0,0 +1,92 @@
+"""
+Per-day roster of who in a department is on approved leave.
+
+All approved leave intervals touching the window are read in one query and
+swept day by day: each interval contributes a start event on its first day in
+the window and an end event on the day after its last, and the set of people
+off is updated only at those events. Results are cached per (department,
+window) under a department version that is bumped whenever a leave request in
+the department changes status.
+"""
+from collections import defaultdict
+from datetime import timedelta
+
+from django.core.cache import cache
+
+from .models import LeaveRequest
+
+CACHE_TIMEOUT = 60 * 60 * 6  # Seconds; status changes invalidate through the department version
+
+
+def _version_key(department_id):
+    return f'hr:team_calendar_version:{department_id}'
+
+
+def department_version(department_id):
+    return cache.get_or_set(_version_key(department_id), 1, timeout=None)
+
+
+def invalidate_departments(department_ids):
+    """Bump the cache version of every department so cached rosters are ignored"""
+    for department_id in set(department_ids):
+        key = _version_key(department_id)
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, 2, timeout=None)
+
+
+def team_roster(department_id, start, end):
+    """
+    {'employees': {id: {...}}, 'days': [{'date', 'off': [employee ids]}]}
+    for every day of [start, end], cached per department and window.
+    """
+    cache_key = f'hr:team_calendar:{department_id}:v{department_version(department_id)}:{start}:{end}'
+    roster = cache.get(cache_key)
+    if roster is None:
+        roster = build_roster(department_id, start, end)
+        cache.set(cache_key, roster, CACHE_TIMEOUT)
+    return roster
+
+
+def build_roster(department_id, start, end):
+    intervals = LeaveRequest.objects.filter(
+        employee__department_id=department_id,
+        status='approved',
+        end_date__gte=start,
+        start_date__lte=end,
+    ).order_by().values_list(
+        'employee_id', 'employee__employee_id', 'employee__user__first_name',
+        'employee__user__last_name', 'employee__user__username',
+        'leave_type', 'start_date', 'end_date',
+    )
+
+    employees = {}
+    starts = defaultdict(list)
+    ends = defaultdict(list)
+    for pk, employee_id, first_name, last_name, username, leave_type, leave_start, leave_end in intervals:
+        employees[pk] = {
+            'employee_id': employee_id,
+            'name': f'{first_name} {last_name}'.strip() or username,
+        }
+        starts[max(leave_start, start)].append((pk, leave_type))
+        ends[min(leave_end, end) + timedelta(days=1)].append((pk, leave_type))
+
+    # Multiset of (employee, leave type) so back-to-back or duplicate intervals don't cancel each other
+    active = defaultdict(int)
+    days = []
+    day = start
+    while day <= end:
+        for key in ends.get(day, ()):
+            active[key] -= 1
+            if not active[key]:
+                del active[key]
+        for key in starts.get(day, ()):
+            active[key] += 1
+        off = sorted({pk: leave_type for pk, leave_type in active}.items())
+        days.append({
+            'date': day.isoformat(),
+            'off': [{'id': pk, 'leave_type': leave_type} for pk, leave_type in off],
+        })
+        day += timedelta(days=1)
+    return {'employees': employees, 'days': days}
@@ -0,0 +1,90 @@
+import threading
+from datetime import date, datetime
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import Client, TransactionTestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from employee.models import Employee
+from .models import Attendance
+
+User = get_user_model()
+
+
+class ConcurrentCheckInOutTests(TransactionTestCase):
+    """Many check-in/check-out posts to mark_attendance at once, as double clicks and several tabs send them"""
+    EMPLOYEES = 4
+    THREADS = 8  # Per employee
+
+    def setUp(self):
+        self.day = timezone.now().date()
+        self.employees = [
+            Employee.objects.create(
+                user=User.objects.create_user(f'user{index}', emailid=f'user{index}@example.com'),
+                employee_id=f'E{index}', position='Engineer', salary=Decimal('1000'), hire_date=date(2024, 1, 1),
+            )
+            for index in range(self.EMPLOYEES)
+        ]
+        # Half the employees already have an 'absent' row for the day, as after reconcile_attendance
+        Attendance.objects.bulk_create(
+            Attendance(employee=employee, date=self.day, status='absent') for employee in self.employees[::2]
+        )
+        self.clients = {}
+        for employee in self.employees:
+            for index in range(self.THREADS):
+                client = Client()
+                client.force_login(employee.user)
+                self.clients[employee.id, index] = client
+
+    def post_all(self, action):
+        """POST action from THREADS clients per employee at once; returns {employee id: [message levels]}"""
+        results = {employee.id: [] for employee in self.employees}
+        failures = []
+        barrier = threading.Barrier(self.EMPLOYEES * self.THREADS)
+
+        def worker(employee, index):
+            client = self.clients[employee.id, index]
+            # Drop the previous round's unread messages, which ride along in a cookie
+            client.cookies.pop('messages', None)
+            try:
+                barrier.wait()
+                response = client.post(reverse('mark_attendance'), {'action': action})
+                self.assertRedirects(response, reverse('mark_attendance'), fetch_redirect_response=False)
+                results[employee.id].extend(message.level_tag for message in response.wsgi_request._messages)
+            except Exception as exc:
+                failures.append(exc)
+            finally:
+                connection.close()
+
+        threads = [
+            threading.Thread(target=worker, args=(employee, index))
+            for employee in self.employees for index in range(self.THREADS)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(failures, [])
+        return results
+
+    def test_one_row_per_employee_and_day(self):
+        check_ins = self.post_all('check_in')
+        check_outs = self.post_all('check_out')
+
+        for employee in self.employees:
+            # One request wins; every other one is told it was already done
+            self.assertEqual(sorted(check_ins[employee.id]), ['success'] + ['warning'] * (self.THREADS - 1))
+            self.assertEqual(sorted(check_outs[employee.id]), ['success'] + ['warning'] * (self.THREADS - 1))
+
+            rows = Attendance.objects.filter(employee=employee, date=self.day)
+            self.assertEqual(rows.count(), 1)
+            row = rows.get()
+            self.assertEqual(row.status, 'present')
+            self.assertEqual(row.recorded_by, employee.user)
+            self.assertIsNotNone(row.check_out_time)
+            self.assertLessEqual(row.check_in_time, row.check_out_time)
+            worked = datetime.combine(self.day, row.check_out_time) - datetime.combine(self.day, row.check_in_time)
+            self.assertEqual(row.working_hours, round(Decimal(worked.total_seconds()) / 3600, 2))
@@ -3,10 +3,16 @@ from . import views
 
 urlpatterns = [
     path('leave-requests/', views.leave_requests, name='leave_requests'),
+    path('leave-requests/bulk/', views.bulk_decide_leave, name='bulk_decide_leave'),
     path('leave-requests/<int:pk>/approve/', views.approve_leave, name='approve_leave'),
+    path('leave-requests/team-calendar/', views.team_calendar, name='team_calendar'),
+    path('leave-requests/team-calendar/data/', views.team_calendar_data, name='team_calendar_data'),
     path('performance-reviews/', views.performance_reviews, name='performance_reviews'),
     path('attendance/', views.attendance_records, name='attendance_records'),
+    path('attendance/calendar/', views.attendance_calendar, name='attendance_calendar'),
     path('my-attendance/', views.employee_attendance, name='employee_attendance'),
     path('mark-attendance/', views.mark_attendance, name='mark_attendance'),
     path('submit-leave/', views.submit_leave_request, name='submit_leave_request'),
+    path('export/attendance/', views.export_attendance, name='export_attendance'),
+    path('export/leave-requests/', views.export_leave_requests, name='export_leave_requests'),
 ]
@@ -1,10 +1,122 @@
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
+from django.core.cache import cache
+from django.core.paginator import Paginator
+from django.http import Http404, JsonResponse, StreamingHttpResponse
+from django.utils.cache import patch_cache_control
+from django.db import IntegrityError, transaction
+from django.db.models import Count, Q, Sum
+from django.db.models.functions import Coalesce
 from django.utils import timezone
-from datetime import datetime
-from .models import LeaveRequest, PerformanceReview, Attendance
-from employee.models import Employee
+import json
+from calendar import monthrange
+from collections import defaultdict
+from datetime import date, datetime, timedelta, timezone as dt_timezone
+from urllib.parse import urlencode
+from .exports import attendance_rows, leave_rows, stream_export
+from .team_calendar import team_roster
+from .calendar_strip import STATUS_CODES, STATUS_LETTERS, month_string, month_version, pack_month, roster_version
+from .models import LeaveRequest, PerformanceReview, Attendance, AttendanceSummary, LeaveBalance, leave_accrual_rates, leave_status_changed
+from employee.models import Employee, Department, ReportingLine
+
+ATTENDANCE_PAGE_SIZE = 24  # Employee cards per attendance overview page
+CALENDAR_CACHE_TIMEOUT = 60 * 60  # Seconds; writes invalidate through the month's and the roster's cache versions
+
+LEAVE_PAGE_SIZE = 20  # Leave requests per page
+EPOCH = datetime(1970, 1, 1, tzinfo=dt_timezone.utc)
+
+TEAM_CALENDAR_MAX_DAYS = 366  # Longest window the team calendar will build
+
+BULK_ACTIONS = {'approve': 'approved', 'reject': 'rejected'}
+BULK_DECIDE_LIMIT = 500  # Most leave requests decided in one bulk action
+
+OVERLAP_MESSAGE = 'You already have a pending or approved leave request overlapping those dates.'
+
+def _leave_request_error(employee, leave_type, start, end):
+    """
+    Why a new leave request for [start, end] can't be submitted, or None. Call
+    inside a transaction: the balance row stays locked until it commits, so
+    concurrent submissions can't each spend the same days.
+    """
+    if leave_type not in dict(LeaveRequest.LEAVE_TYPES):
+        return 'Please choose a valid leave type.'
+    if LeaveRequest.objects.overlapping(employee, start, end).exists():
+        return OVERLAP_MESSAGE
+    if leave_type in leave_accrual_rates():
+        balance = LeaveBalance.objects.lock([(employee.id, leave_type)])[(employee.id, leave_type)]
+        # Days already asked for and not yet decided are spoken for
+        available = balance - LeaveRequest.objects.pending_days(employee, leave_type)
+        days = (end - start).days + 1
+        if days > available:
+            return f'Insufficient leave balance: {days} days requested, {max(available, 0)} available.'
+    return LeaveRequest.objects.capacity_error(employee, start, end)
+
+def _submit_leave_request(employee, leave_type, start, end, reason):
+    """Create a pending leave request; returns why it can't be, or None"""
+    try:
+        with transaction.atomic():
+            error = _leave_request_error(employee, leave_type, start, end)
+            if error:
+                return error
+            LeaveRequest.objects.create(
+                employee=employee,
+                leave_type=leave_type,
+                start_date=start,
+                end_date=end,
+                reason=reason,
+                status='pending'
+            )
+    except IntegrityError:
+        # The PostgreSQL exclusion constraint caught a concurrent overlapping request
+        return OVERLAP_MESSAGE
+    return None
+
+def _set_leave_status(leave_request, status, user):
+    """
+    Save a new status and post the matching balance change to the leave ledger.
+    Approving re-checks overlap, department capacity and balance while holding
+    the locks. Returns why the change can't be made, or None.
+    """
+    try:
+        with transaction.atomic():
+            # Lock the row so two concurrent approvals can't both consume the days
+            previous_status = LeaveRequest.objects.select_for_update().filter(
+                pk=leave_request.pk,
+            ).values_list('status', flat=True).first()
+            if status == 'approved' and previous_status != 'approved':
+                error = _approval_error(leave_request, previous_status)
+                if error:
+                    return error
+            leave_request.status = status
+            leave_request.approved_by = user
+            leave_request.save()
+            leave_status_changed.send(sender=LeaveRequest, changes=[(leave_request, previous_status)], user=user)
+    except IntegrityError:
+        # The PostgreSQL exclusion constraint caught an overlap committed meanwhile
+        return 'This leave request overlaps another pending or approved request of the employee.'
+    return None
+
+def _approval_error(leave_request, previous_status):
+    """Why leave_request can't be approved now, or None. Call with its row locked."""
+    employee = leave_request.employee
+    if previous_status == 'rejected' and LeaveRequest.objects.overlapping(
+        employee, leave_request.start_date, leave_request.end_date,
+    ).exclude(pk=leave_request.pk).exists():
+        # Pending requests passed the overlap check when submitted; rejected ones may have been overtaken
+        return 'This leave request overlaps another pending or approved request of the employee.'
+    if employee.department_id is not None:
+        # Concurrent approvals in the department wait here, so each sees the others' days
+        LeaveRequest.objects.lock_departments([employee.department_id])
+        capacity_error = LeaveRequest.objects.capacity_error(employee, leave_request.start_date, leave_request.end_date)
+        if capacity_error:
+            return capacity_error
+    if leave_request.leave_type in leave_accrual_rates():
+        key = (leave_request.employee_id, leave_request.leave_type)
+        balance = LeaveBalance.objects.lock([key])[key]
+        if leave_request.days > balance:
+            return f'Insufficient leave balance: {leave_request.days} days requested, {balance} available.'
+    return None
 
 @login_required
 def leave_requests(request):
@@ -12,9 +124,8 @@ def leave_requests(request):
 
     # Handle leave request submission (for employees)
     if request.method == 'POST' and request.POST.get('action') == 'submit':
-        try:
-            employee = Employee.objects.get(user=request.user)
-        except Employee.DoesNotExist:
+        employee = request.employee
+        if not employee:
             messages.error(request, 'Employee profile not found.')
             return redirect('leave_requests')
 
@@ -42,15 +153,10 @@ def leave_requests(request):
             messages.error(request, 'Invalid date format.')
             return redirect('leave_requests')
 
-        # Create leave request
-        LeaveRequest.objects.create(
-            employee=employee,
-            leave_type=leave_type,
-            start_date=start,
-            end_date=end,
-            reason=reason,
-            status='pending'
-        )
+        error = _submit_leave_request(employee, leave_type, start, end, reason)
+        if error:
+            messages.error(request, error)
+            return redirect('leave_requests')
 
         messages.success(request, 'Leave request submitted successfully!')
         return redirect('leave_requests')
@@ -65,88 +171,184 @@ def leave_requests(request):
         action = request.POST.get('approve_action')
 
         try:
-            leave_request = LeaveRequest.objects.get(id=leave_id)
-            if action == 'approve':
-                leave_request.status = 'approved'
-                leave_request.approved_by = request.user
-                messages.success(request, 'Leave request approved.')
-            elif action == 'reject':
-                leave_request.status = 'rejected'
-                leave_request.approved_by = request.user
-                messages.success(request, 'Leave request rejected.')
-
-            leave_request.save()
+            leave_request = LeaveRequest.objects.select_related('employee__user', 'employee__department').get(id=leave_id)
+            if action in BULK_ACTIONS:
+                error = _set_leave_status(leave_request, BULK_ACTIONS[action], request.user)
+                if error:
+                    messages.error(request, error)
+                else:
+                    messages.success(request, f'Leave request {BULK_ACTIONS[action]}.')
         except LeaveRequest.DoesNotExist:
             messages.error(request, 'Leave request not found.')
 
         return redirect('leave_requests')
 
-    # Get status filter from URL parameters
-    status_filter = request.GET.get('status', 'all')
-
-    # Filter leave requests based on user role and status
-    if request.user.role == 'hr' or request.user.is_staff:
-        # HR sees all requests
-        if status_filter == 'pending':
-            leave_requests = LeaveRequest.objects.select_related('employee__user', 'employee__department').filter(status='pending')
-        elif status_filter == 'approved':
-            leave_requests = LeaveRequest.objects.select_related('employee__user', 'employee__department').filter(status='approved')
-        elif status_filter == 'rejected':
-            leave_requests = LeaveRequest.objects.select_related('employee__user', 'employee__department').filter(status='rejected')
-        else:
-            leave_requests = LeaveRequest.objects.select_related('employee__user', 'employee__department').all()
-    else:
-        # Employees see only their own requests
-        try:
-            employee = Employee.objects.get(user=request.user)
-            if status_filter == 'pending':
-                leave_requests = LeaveRequest.objects.select_related('employee__user', 'employee__department').filter(employee=employee, status='pending')
-            elif status_filter == 'approved':
-                leave_requests = LeaveRequest.objects.select_related('employee__user', 'employee__department').filter(employee=employee, status='approved')
-            elif status_filter == 'rejected':
-                leave_requests = LeaveRequest.objects.select_related('employee__user', 'employee__department').filter(employee=employee, status='rejected')
-            else:
-                leave_requests = LeaveRequest.objects.select_related('employee__user', 'employee__department').filter(employee=employee)
-        except Employee.DoesNotExist:
-            leave_requests = LeaveRequest.objects.none()
-
-    # Calculate statistics
-    if request.user.role == 'hr' or request.user.is_staff:
+    is_hr = request.user.role == 'hr' or request.user.is_staff
+    if is_hr:
         all_requests = LeaveRequest.objects.all()
     else:
-        try:
-            employee = Employee.objects.get(user=request.user)
-            all_requests = LeaveRequest.objects.filter(employee=employee)
-        except Employee.DoesNotExist:
+        # Employees see their own requests and, if they manage anyone, their whole reporting subtree's
+        employee = request.employee
+        if employee:
+            all_requests = LeaveRequest.objects.filter(
+                Q(employee=employee) | Q(employee__in=ReportingLine.objects.filter(ancestor=employee).values('descendant'))
+            )
+        else:
             all_requests = LeaveRequest.objects.none()
 
-    pending_count = all_requests.filter(status='pending').count()
-    approved_count = all_requests.filter(status='approved').count()
-    rejected_count = all_requests.filter(status='rejected').count()
+    # All four counters in one conditional aggregation
+    counts = all_requests.aggregate(
+        total_count=Count('id'),
+        pending_count=Count('id', filter=Q(status='pending')),
+        approved_count=Count('id', filter=Q(status='approved')),
+        rejected_count=Count('id', filter=Q(status='rejected')),
+    )
+
+    filters = {
+        'status': request.GET.get('status', 'all'),
+        'leave_type': request.GET.get('leave_type', ''),
+        'department': request.GET.get('department', '') if is_hr else '',
+        'date_from': request.GET.get('date_from', ''),
+        'date_to': request.GET.get('date_to', ''),
+    }
+    leave_requests = all_requests.select_related('employee__user', 'employee__department')
+    if filters['status'] in ('pending', 'approved', 'rejected'):
+        leave_requests = leave_requests.filter(status=filters['status'])
+    if filters['leave_type']:
+        leave_requests = leave_requests.filter(leave_type=filters['leave_type'])
+    try:
+        if filters['department']:
+            leave_requests = leave_requests.filter(employee__department_id=int(filters['department']))
+        # Requests overlapping the range
+        if filters['date_from']:
+            leave_requests = leave_requests.filter(end_date__gte=date.fromisoformat(filters['date_from']))
+        if filters['date_to']:
+            leave_requests = leave_requests.filter(start_date__lte=date.fromisoformat(filters['date_to']))
+    except ValueError:
+        messages.error(request, 'Invalid filter: pick a department from the list and give dates as YYYY-MM-DD.')
+        return redirect('leave_requests')
+
+    page, newer_cursor, older_cursor = _leave_page(
+        leave_requests, request.GET.get('after'), request.GET.get('before'),
+    )
 
     context = {
-        'leave_requests': leave_requests,
-        'status_filter': status_filter,
-        'pending_count': pending_count,
-        'approved_count': approved_count,
-        'rejected_count': rejected_count,
-        'is_hr': request.user.role == 'hr' or request.user.is_staff,
+        'leave_requests': page,
+        'status_filter': filters['status'],
+        'filters': filters,
+        'filter_query': urlencode({key: value for key, value in filters.items() if value and value != 'all'}),
+        'newer_cursor': newer_cursor,
+        'older_cursor': older_cursor,
+        'leave_types': LeaveRequest.LEAVE_TYPES,
+        'departments': Department.objects.order_by('name') if is_hr else [],
+        **counts,
+        'is_hr': is_hr,
     }
 
     return render(request, 'hr/leave_requests.html', context)
 
+def _leave_cursor(leave_request):
+    """Opaque keyset position of a leave request in (created_at, id) order"""
+    micros = (leave_request.created_at - EPOCH) // timedelta(microseconds=1)
+    return f'{micros}-{leave_request.id}'
+
+def _parse_leave_cursor(value):
+    try:
+        micros, pk = map(int, value.split('-'))
+    except (AttributeError, ValueError):
+        return None
+    return EPOCH + timedelta(microseconds=micros), pk
+
+def _leave_page(leave_requests, after=None, before=None):
+    """
+    One page of leave requests, newest first, that starts after (or ends
+    before) a cursor, plus the cursors of the neighbouring pages.
+    """
+    after, before = _parse_leave_cursor(after), _parse_leave_cursor(before)
+    if before:
+        created_at, pk = before
+        rows = list(leave_requests.filter(
+            Q(created_at__gt=created_at) | Q(created_at=created_at, id__gt=pk)
+        ).order_by('created_at', 'id')[:LEAVE_PAGE_SIZE + 1])
+        has_more = len(rows) > LEAVE_PAGE_SIZE
+        page = rows[:LEAVE_PAGE_SIZE][::-1]
+        newer = _leave_cursor(page[0]) if has_more else None
+        older = _leave_cursor(page[-1]) if page else None
+        return page, newer, older
+
+    if after:
+        created_at, pk = after
+        leave_requests = leave_requests.filter(
+            Q(created_at__lt=created_at) | Q(created_at=created_at, id__lt=pk)
+        )
+    rows = list(leave_requests.order_by('-created_at', '-id')[:LEAVE_PAGE_SIZE + 1])
+    page = rows[:LEAVE_PAGE_SIZE]
+    newer = _leave_cursor(page[0]) if after and page else None
+    older = _leave_cursor(page[-1]) if len(rows) > LEAVE_PAGE_SIZE else None
+    return page, newer, older
+
 @login_required
 def approve_leave(request, pk):
     if request.user.role != 'hr' and not request.user.is_staff:
         messages.error(request, 'You do not have permission to approve leave requests.')
         return redirect('leave_requests')
 
-    leave_request = get_object_or_404(LeaveRequest, pk=pk)
-    leave_request.status = 'approved'
-    leave_request.approved_by = request.user
-    leave_request.save()
+    leave_request = get_object_or_404(LeaveRequest.objects.select_related('employee__user', 'employee__department'), pk=pk)
+    error = _set_leave_status(leave_request, 'approved', request.user)
+    if error:
+        messages.error(request, error)
+    else:
+        messages.success(request, 'Leave request approved.')
+    return redirect('leave_requests')
+
+@login_required
+def bulk_decide_leave(request):
+    """Approve or reject a list of pending leave requests in one transaction"""
+    wants_json = request.content_type == 'application/json'
+    if not (request.user.role == 'hr' or request.user.is_staff):
+        if wants_json:
+            return JsonResponse({'error': 'You do not have permission to approve leave requests.'}, status=403)
+        messages.error(request, 'You do not have permission to approve leave requests.')
+        return redirect('leave_requests')
+    if request.method != 'POST':
+        return redirect('leave_requests')
+
+    if wants_json:
+        try:
+            payload = json.loads(request.body)
+            ids, action = payload['ids'], payload['action']
+            ids = [int(pk) for pk in ids]
+        except (ValueError, KeyError, TypeError):
+            return JsonResponse({'error': 'Expected {"ids": [...], "action": "approve" or "reject"}.'}, status=400)
+    else:
+        try:
+            ids = [int(pk) for pk in request.POST.getlist('ids')]
+        except ValueError:
+            ids = []
+        action = request.POST.get('approve_action')
+
+    if action not in BULK_ACTIONS or not ids or len(ids) > BULK_DECIDE_LIMIT:
+        error = f'Select between 1 and {BULK_DECIDE_LIMIT} leave requests and approve or reject them.'
+        if wants_json:
+            return JsonResponse({'error': error}, status=400)
+        messages.error(request, error)
+        return redirect('leave_requests')
 
-    messages.success(request, 'Leave request approved.')
+    outcomes = LeaveRequest.objects.decide(ids, BULK_ACTIONS[action], request.user)
+
+    if wants_json:
+        return JsonResponse({'results': {str(pk): outcome for pk, outcome in outcomes.items()}})
+    done = sum(outcome == BULK_ACTIONS[action] for outcome in outcomes.values())
+    messages.success(request, f'{done} leave request{"" if done == 1 else "s"} {BULK_ACTIONS[action]}.')
+    skipped = len(outcomes) - done
+    if skipped:
+        over_capacity = sum(outcome == 'over_capacity' for outcome in outcomes.values())
+        insufficient = sum(outcome == 'insufficient_balance' for outcome in outcomes.values())
+        messages.error(
+            request,
+            f'{skipped} skipped: {over_capacity} would exceed a department leave limit, '
+            f'{insufficient} exceed the employee\'s leave balance, the rest were no longer pending.',
+        )
     return redirect('leave_requests')
 
 @login_required
@@ -155,25 +357,36 @@ def performance_reviews(request):
         reviews = PerformanceReview.objects.select_related('employee__user', 'reviewer').all()
     else:
         # Employees can only see their own reviews
-        employee = get_object_or_404(Employee, user=request.user)
-        reviews = PerformanceReview.objects.filter(employee=employee)
+        if not request.employee:
+            raise Http404('Employee profile not found.')
+        reviews = PerformanceReview.objects.filter(employee=request.employee)
 
     return render(request, 'hr/performance_reviews.html', {'reviews': reviews})
 
 @login_required
 def attendance_records(request):
-    if not (request.user.role == 'hr' or request.user.is_staff):
+    allowed, manager = _attendance_scope(request)
+    if not allowed:
         messages.error(request, 'You do not have permission to view attendance records.')
         return redirect('dashboard')
 
-    employees = Employee.objects.select_related('user', 'department').all()
+    today = timezone.now().date()
+    department_filter = _department_filter(request)
+
+    # Totals and present days for every employee in one aggregate query over the monthly rollup
+    employees = _attendance_employees(department_filter, manager).select_related('user', 'department').annotate(
+        total_days=Coalesce(Sum('attendance_summaries__total_count'), 0),
+        present_days=Coalesce(Sum('attendance_summaries__present_count'), 0),
+    )
 
-    # Get attendance statistics for each employee
+    paginator = Paginator(employees, ATTENDANCE_PAGE_SIZE)
+    page_obj = paginator.get_page(request.GET.get('page'))
+
+    # The calendar strips are filled in by the page from attendance_calendar
     employee_stats = []
-    for employee in employees:
-        attendance_records = Attendance.objects.filter(employee=employee)
-        total_days = attendance_records.count()
-        present_days = attendance_records.filter(status='present').count()
+    for employee in page_obj.object_list:
+        total_days = employee.total_days
+        present_days = employee.present_days
         attendance_rate = round((present_days / total_days * 100), 1) if total_days > 0 else 0
 
         employee_stats.append({
@@ -181,42 +394,129 @@ def attendance_records(request):
             'total_days': total_days,
             'present_days': present_days,
             'attendance_rate': attendance_rate,
-            'recent_attendance': attendance_records.order_by('-date')[:31]  # Last 31 days for calendar view
         })
 
     context = {
-        'employees': employees,
         'employee_stats': employee_stats,
-        'today': timezone.now().date(),
+        'page_obj': page_obj,
+        'departments': Department.objects.order_by('name'),
+        'department_filter': department_filter,
+        'today': today,
+        'calendar_month': today.strftime('%Y-%m'),
     }
 
     return render(request, 'hr/attendance.html', context)
 
+@login_required
+def attendance_calendar(request):
+    """JSON month of attendance for a page of employees, one packed code string per employee"""
+    allowed, manager = _attendance_scope(request)
+    if not allowed:
+        return JsonResponse({'error': 'You do not have permission to view attendance records.'}, status=403)
+
+    try:
+        year, month = map(int, request.GET.get('month', timezone.now().strftime('%Y-%m')).split('-'))
+        first_day = date(year, month, 1)
+    except ValueError:
+        return JsonResponse({'error': 'month must look like YYYY-MM.'}, status=400)
+
+    department_filter = _department_filter(request)
+    page_number = request.GET.get('page', '1')
+    cache_key = (
+        f'hr:attendance_calendar:{year}-{month:02d}:v{month_version(year, month)}:r{roster_version()}'
+        f':dept={department_filter}:page={page_number}:manager={manager.id if manager else ""}'
+    )
+    data = cache.get(cache_key)
+
+    if data is None:
+        days = monthrange(year, month)[1]
+        paginator = Paginator(
+            _attendance_employees(department_filter, manager).values_list(
+                'id', 'employee_id', 'user__first_name', 'user__last_name', 'user__username',
+            ),
+            ATTENDANCE_PAGE_SIZE,
+        )
+        page_obj = paginator.get_page(page_number)
+        page_employees = list(page_obj.object_list)
+
+        statuses = defaultdict(dict)
+        rows = Attendance.objects.filter(
+            employee_id__in=[row[0] for row in page_employees],
+            date__range=(first_day, date(year, month, days)),
+        ).order_by().values_list('employee_id', 'date', 'status')
+        for employee_id, day, status in rows:
+            statuses[employee_id][day.day] = status
+
+        data = {
+            'month': f'{year}-{month:02d}',
+            'days': days,
+            'codes': {status: code for status, code in STATUS_CODES.items() if status},
+            'letters': STATUS_LETTERS,
+            'page': page_obj.number,
+            'num_pages': paginator.num_pages,
+            'employees': [
+                {
+                    'id': pk,
+                    'employee_id': employee_id,
+                    'name': f'{first_name} {last_name}'.strip() or username,
+                    'days': month_string(statuses[pk], days),
+                    'bitmap': pack_month(statuses[pk], days),
+                }
+                for pk, employee_id, first_name, last_name, username in page_employees
+            ],
+        }
+        cache.set(cache_key, data, CALENDAR_CACHE_TIMEOUT)
+
+    response = JsonResponse(data)
+    patch_cache_control(response, private=True, max_age=60)
+    return response
+
+def _attendance_scope(request):
+    """(may view the attendance overview, manager whose reporting subtree it is limited to or None)"""
+    if request.user.role == 'hr' or request.user.is_staff:
+        return True, None
+    manager = request.employee
+    if not (manager and manager.direct_reports.exists()):
+        return False, None
+    return True, manager
+
+def _department_filter(request):
+    """The ?department= id as a string, or '' when it is missing or not a number"""
+    try:
+        return str(int(request.GET.get('department', '')))
+    except ValueError:
+        return ''
+
+def _attendance_employees(department_filter, manager=None):
+    """Employees in the order the attendance overview pages through them"""
+    employees = Employee.objects.order_by('user__first_name', 'user__last_name', 'id')
+    if manager is not None:
+        employees = employees.reports_of(manager)
+    if department_filter:
+        employees = employees.filter(department_id=department_filter)
+    return employees
+
 @login_required
 def employee_attendance(request):
     """View for employees to see their own attendance"""
-    try:
-        employee = Employee.objects.get(user=request.user)
-    except Employee.DoesNotExist:
+    employee = request.employee
+    if not employee:
         messages.error(request, 'Employee profile not found.')
         return redirect('dashboard')
 
     attendance_records = Attendance.objects.filter(employee=employee).order_by('-date')
-    total_days = attendance_records.count()
-    present_days = attendance_records.filter(status='present').count()
-    attendance_rate = round((present_days / total_days * 100), 1) if total_days > 0 else 0
 
-    # Monthly breakdown
-    from django.db.models import Count, Q
-    from django.db.models.functions import ExtractMonth, ExtractYear
+    # Totals and monthly breakdown come from the monthly rollup
+    summaries = AttendanceSummary.objects.filter(employee=employee)
+    totals = summaries.aggregate(
+        total_days=Coalesce(Sum('total_count'), 0),
+        present_days=Coalesce(Sum('present_count'), 0),
+    )
+    total_days = totals['total_days']
+    present_days = totals['present_days']
+    attendance_rate = round((present_days / total_days * 100), 1) if total_days > 0 else 0
 
-    monthly_stats = attendance_records.annotate(
-        month=ExtractMonth('date'),
-        year=ExtractYear('date')
-    ).values('month', 'year').annotate(
-        present_count=Count('id', filter=Q(status='present')),
-        total_count=Count('id')
-    ).order_by('-year', '-month')[:6]
+    monthly_stats = summaries.values('month', 'year', 'present_count', 'total_count')[:6]
 
     context = {
         'employee': employee,
@@ -233,56 +533,37 @@ def employee_attendance(request):
 @login_required
 def mark_attendance(request):
     """View for employees to mark their attendance"""
-    try:
-        employee = Employee.objects.get(user=request.user)
-    except Employee.DoesNotExist:
+    employee = request.employee
+    if not employee:
         messages.error(request, 'Employee profile not found.')
         return redirect('dashboard')
 
     today = timezone.now().date()
     current_time = timezone.now().time()
 
-    # Check if attendance already marked for today
-    today_attendance = Attendance.objects.filter(employee=employee, date=today).first()
-
     if request.method == 'POST':
         action = request.POST.get('action')
 
+        # Both actions are single conditional writes, so double clicks and
+        # concurrent requests can't create duplicates or overwrite a check-out
         if action == 'check_in':
-            if today_attendance:
-                messages.warning(request, 'You have already checked in today.')
-            else:
-                Attendance.objects.create(
-                    employee=employee,
-                    date=today,
-                    status='present',
-                    check_in_time=current_time,
-                    recorded_by=request.user
-                )
+            if Attendance.objects.check_in(employee.id, today, current_time, recorded_by=request.user):
                 messages.success(request, f'Checked in successfully at {current_time.strftime("%I:%M %p")}')
-                return redirect('mark_attendance')
+            else:
+                messages.warning(request, 'You have already checked in today.')
+            return redirect('mark_attendance')
 
         elif action == 'check_out':
-            if not today_attendance:
-                messages.error(request, 'You must check in first before checking out.')
-            elif today_attendance.check_out_time:
+            if Attendance.objects.check_out(employee.id, today, current_time):
+                messages.success(request, f'Checked out successfully at {current_time.strftime("%I:%M %p")}')
+            elif Attendance.objects.filter(employee=employee, date=today, check_in_time__isnull=False).exists():
                 messages.warning(request, 'You have already checked out today.')
             else:
-                today_attendance.check_out_time = current_time
-                # Calculate working hours
-                if today_attendance.check_in_time:
-                    # Combine date with check-in time and make it timezone-aware
-                    check_in_datetime = timezone.make_aware(
-                        datetime.combine(today, today_attendance.check_in_time)
-                    )
-                    check_out_datetime = timezone.now()
-
-                    time_diff = check_out_datetime - check_in_datetime
-                    working_hours = time_diff.total_seconds() / 3600  # Convert to hours
-                    today_attendance.working_hours = round(working_hours, 2)
-                today_attendance.save()
-                messages.success(request, f'Checked out successfully at {current_time.strftime("%I:%M %p")}')
-                return redirect('mark_attendance')
+                messages.error(request, 'You must check in first before checking out.')
+            return redirect('mark_attendance')
+
+    # Check if attendance already marked for today
+    today_attendance = Attendance.objects.filter(employee=employee, date=today).first()
 
     # Get today's attendance status
     attendance_status = None
@@ -316,9 +597,8 @@ def mark_attendance(request):
 @login_required
 def submit_leave_request(request):
     """View for employees to submit leave requests"""
-    try:
-        employee = Employee.objects.get(user=request.user)
-    except Employee.DoesNotExist:
+    employee = request.employee
+    if not employee:
         messages.error(request, 'Employee profile not found.')
         return redirect('dashboard')
 
@@ -347,15 +627,10 @@ def submit_leave_request(request):
             messages.error(request, 'Invalid date format.')
             return redirect('submit_leave_request')
 
-        # Create leave request
-        LeaveRequest.objects.create(
-            employee=employee,
-            leave_type=leave_type,
-            start_date=start,
-            end_date=end,
-            reason=reason,
-            status='pending'
-        )
+        error = _submit_leave_request(employee, leave_type, start, end, reason)
+        if error:
+            messages.error(request, error)
+            return redirect('submit_leave_request')
 
         messages.success(request, 'Leave request submitted successfully!')
         return redirect('dashboard')
@@ -365,3 +640,135 @@ def submit_leave_request(request):
     }
 
     return render(request, 'hr/submit_leave_request.html', context)
+
+def _team_calendar_window(request):
+    """((departments the user may see, chosen department, start, end), None) or (None, (error message, HTTP status))"""
+    if request.user.role == 'hr' or request.user.is_staff:
+        departments = Department.objects.order_by('name')
+    else:
+        departments = Department.objects.filter(manager=request.user).order_by('name')
+    departments = list(departments.only('id', 'name'))
+    if not departments:
+        return None, ('You do not manage any department.', 403)
+
+    try:
+        department_id = int(request.GET.get('department') or departments[0].id)
+        quarter = request.GET.get('quarter')
+        if request.GET.get('start') or request.GET.get('end'):
+            start = date.fromisoformat(request.GET['start'])
+            end = date.fromisoformat(request.GET['end'])
+        else:
+            if quarter:
+                year, number = quarter.upper().split('-Q')
+                year, number = int(year), int(number)
+                if not 1 <= number <= 4:
+                    raise ValueError
+            else:
+                today = timezone.now().date()
+                year, number = today.year, (today.month - 1) // 3 + 1
+            start = date(year, number * 3 - 2, 1)
+            end = date(year, number * 3, monthrange(year, number * 3)[1])
+    except (KeyError, ValueError):
+        return None, ('Pass quarter=YYYY-Qn or both start and end as YYYY-MM-DD.', 400)
+
+    department = next((d for d in departments if d.id == department_id), None)
+    if department is None:
+        return None, ('You cannot view that department.', 403)
+    if end < start or (end - start).days >= TEAM_CALENDAR_MAX_DAYS:
+        return None, (f'The window must run forwards and span at most {TEAM_CALENDAR_MAX_DAYS} days.', 400)
+    return (departments, department, start, end), None
+
+@login_required
+def team_calendar(request):
+    """Who in a department is on approved leave on each day of a quarter"""
+    window, error = _team_calendar_window(request)
+    if error:
+        messages.error(request, error[0])
+        return redirect('dashboard')
+    departments, department, start, end = window
+
+    roster = team_roster(department.id, start, end)
+    employees = roster['employees']
+    days = [
+        {
+            'date': date.fromisoformat(day['date']),
+            'off': [
+                {**employees[entry['id']], 'leave_type': entry['leave_type']}
+                for entry in day['off']
+            ],
+        }
+        for day in roster['days']
+    ]
+
+    context = {
+        'departments': departments,
+        'department': department,
+        'start': start,
+        'end': end,
+        'days': days,
+        'peak': max((len(day['off']) for day in days), default=0),
+    }
+    return render(request, 'hr/team_calendar.html', context)
+
+@login_required
+def team_calendar_data(request):
+    """JSON form of team_calendar: employees once, then the ids off on each day"""
+    window, error = _team_calendar_window(request)
+    if error:
+        message, status = error
+        return JsonResponse({'error': message}, status=status)
+    _, department, start, end = window
+
+    response = JsonResponse({
+        'department': {'id': department.id, 'name': department.name},
+        'start': start.isoformat(),
+        'end': end.isoformat(),
+        **team_roster(department.id, start, end),
+    })
+    patch_cache_control(response, private=True, max_age=60)
+    return response
+
+EXPORT_CONTENT_TYPES = {
+    'csv': 'text/csv',
+    'xlsx': 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+}
+
+@login_required
+def export_attendance(request):
+    """Stream attendance rows as CSV or XLSX for payroll audits"""
+    return _export(request, attendance_rows, 'attendance')
+
+@login_required
+def export_leave_requests(request):
+    """Stream leave requests as CSV or XLSX"""
+    return _export(request, leave_rows, 'leave_requests')
+
+def _export(request, build_rows, name):
+    if not (request.user.role == 'hr' or request.user.is_staff):
+        messages.error(request, 'You do not have permission to export HR data.')
+        return redirect('dashboard')
+
+    fmt = request.GET.get('format', 'csv')
+    if fmt not in EXPORT_CONTENT_TYPES:
+        fmt = 'csv'
+
+    try:
+        start = datetime.strptime(request.GET['start'], '%Y-%m-%d').date() if request.GET.get('start') else None
+        end = datetime.strptime(request.GET['end'], '%Y-%m-%d').date() if request.GET.get('end') else None
+    except ValueError:
+        messages.error(request, 'Invalid date format.')
+        return redirect('dashboard')
+
+    columns, rows = build_rows(
+        start=start,
+        end=end,
+        department=_department_filter(request) or None,
+        status=request.GET.get('status') or None,
+    )
+    filename = '_'.join(part for part in [name, str(start or ''), str(end or '')] if part)
+    response = StreamingHttpResponse(
+        stream_export(columns, rows, fmt, sheet_name=name.replace('_', ' ').title()),
+        content_type=EXPORT_CONTENT_TYPES[fmt],
+    )
+    response['Content-Disposition'] = f'attachment; filename="{filename}.{fmt}"'
+    return response
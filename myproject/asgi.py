@@ -3,6 +3,12 @@ ASGI config for myproject project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
 
+Served this way, accounts.views.login_view runs natively async and every
+password check runs on the bounded accounts.backends.PASSWORD_HASH_POOL, so a
+login burst at shift change queues for CPU rather than for workers. Under WSGI
+the same view still works, run to completion in each request's worker.
+`manage.py login_load_test` measures login latency under a burst.
+
 For more information on this file, see
 https://docs.djangoproject.com/en/5.1/howto/deployment/asgi/
 """
@@ -48,6 +48,7 @@ MIDDLEWARE = [
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'employee.middleware.EmployeeMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -87,6 +88,53 @@ DATABASES = {
     }
 }
 
+# Partition hr_attendance by month (PostgreSQL only). Opt-in: turn it on, then
+# run python manage.py create_attendance_partitions --convert
+ATTENDANCE_PARTITIONING = False
+
+# Months of attendance kept attached by archive_attendance_partitions
+ATTENDANCE_RETENTION_MONTHS = 24
+
+# Used by reconcile_attendance: weekdays (Monday = 0) on which a missing check-in
+# counts as an absence, and the check-out time given to rows left open
+ATTENDANCE_WORKING_DAYS = [0, 1, 2, 3, 4]
+ATTENDANCE_AUTO_CLOSE_TIME = '20:00'
+
+# Shift rules used by recompute_working_hours (local times per employee time zone)
+ATTENDANCE_SHIFT = {
+    'start': '09:00',
+    'end': '18:00',
+    'count_early_arrival': False,
+    'count_late_departure': True,
+    'break_minutes': 60,
+    'break_after_hours': 6,
+    'overtime_after_hours': 8,
+}
+
+# Leave days accrued per employee each month by accrue_leave; other leave
+# types (e.g. maternity) are granted through ledger adjustments only
+LEAVE_ACCRUAL = {
+    'annual': 1.5,
+    'sick': 1,
+    'personal': 0.5,
+}
+
+# Leave days credited to every employee when they are created (and to
+# existing employees by hr migration 0011), so requests work before the first accrual
+LEAVE_OPENING_BALANCE = {
+    'annual': 18,
+    'sick': 12,
+    'personal': 6,
+}
+
+# Notifications are queued in hr.OutboxEvent and emailed by dispatch_notifications;
+# point EMAIL_BACKEND at SMTP (EMAIL_HOST etc.) in production
+EMAIL_BACKEND = 'django.core.mail.backends.console.EmailBackend'
+DEFAULT_FROM_EMAIL = 'HR Management System <noreply@localhost>'
+
+# Extra addresses told about every new leave request, besides the department manager
+HR_NOTIFICATION_EMAILS = []
+
 # PostgreSQL configuration (use: python switch_to_sqlite.py postgres):
 # DATABASES = {
 #     'default': {
@@ -139,6 +187,57 @@ STATIC_URL = 'static/'
 # Custom user model
 AUTH_USER_MODEL = 'accounts.CustomUser'
 
+# Email and password first (the login page); username login stays available for the admin
+AUTHENTICATION_BACKENDS = [
+    'accounts.backends.EmailBackend',
+    'django.contrib.auth.backends.ModelBackend',
+]
+
+# Failed logins allowed per sliding window, per client IP and per email ID;
+# checked before any password is hashed (see accounts/ratelimit.py). Raise
+# 'ip' when many people share one address, e.g. an office behind NAT.
+LOGIN_RATE_LIMIT = {
+    'ip': 100,
+    'emailid': 10,
+    'window': 300,  # Seconds
+    'cache': 'login_attempts',
+}
+
+# Threads hashing login passwords; bounds the CPU a login burst can take
+LOGIN_HASH_THREADS = 4
+
+# Seconds request.employee is cached per user; 0 loads it once per request
+EMPLOYEE_PROFILE_CACHE_TIMEOUT = 0
+
+# Local-memory caches are per process; login counters get their own so the
+# large calendar and analytics entries can't cull them
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'login_attempts': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'login-attempts',
+        'OPTIONS': {'MAX_ENTRIES': 50000},
+    },
+    # Sessions and logged-in users; on disk so every worker process on the host shares it
+    'sessions': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': BASE_DIR / 'cache' / 'sessions',
+        'OPTIONS': {'MAX_ENTRIES': 50000},
+    },
+}
+
+# Sessions are read from the 'sessions' cache and written through to the
+# database, so a page view normally costs no session query. Nodes without a
+# shared cache can use 'django.contrib.sessions.backends.signed_cookies'
+# instead, which stores nothing server-side.
+SESSION_ENGINE = 'django.contrib.sessions.backends.cached_db'
+SESSION_CACHE_ALIAS = 'sessions'
+
+# Seconds the logged-in user is served from the 'sessions' cache; saving the user invalidates it
+USER_CACHE_TIMEOUT = 60 * 5
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.1/ref/settings/#default-auto-field
 